@@ -0,0 +1,34 @@
+"""
+Cachés en memoria de corta duración para autenticación (tokens verificados y usuarios cargados)
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+from core.config import settings
+
+# clave -> (instante de expiración monotónico, valor)
+token_cache: Dict[str, Tuple[float, dict]] = {}
+user_cache: Dict[str, Tuple[float, dict]] = {}
+
+def cache_get(cache: Dict[str, Tuple[float, dict]], key: str) -> Optional[dict]:
+    """Leer una entrada vigente de la caché (las vencidas se descartan)"""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        cache.pop(key, None)
+        return None
+    return entry[1]
+
+def cache_set(cache: Dict[str, Tuple[float, dict]], key: str, value: dict, ttl: float) -> None:
+    """Guardar una entrada; si la caché está llena se descarta la más antigua"""
+    if ttl <= 0:
+        return
+    if key not in cache and len(cache) >= settings.AUTH_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)), None)
+    cache[key] = (time.monotonic() + ttl, value)
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Olvidar el usuario cacheado (llamar después de modificarlo)"""
+    user_cache.pop(user_id, None)
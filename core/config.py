@@ -1,5 +1,6 @@
-from pydantic_settings import BaseSettings
-from typing import List
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -16,33 +17,49 @@ class Settings(BaseSettings):
     # Database settings (PostgreSQL via Supabase)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./ludix_app.db")  # Fallback a SQLite
     
+    # Pool de conexiones HTTP hacia PostgREST (pool_size + max_overflow <= 15 para el pooler de Supabase)
+    SUPABASE_POOL_SIZE: int = 10          # Conexiones keep-alive reutilizables
+    SUPABASE_POOL_MAX_OVERFLOW: int = 5   # Conexiones extra permitidas en picos
+    SUPABASE_POOL_TIMEOUT: float = 30.0   # Segundos esperando una conexión libre del pool
+    SUPABASE_POOL_RECYCLE: float = 1800.0  # Segundos que una conexión ociosa se mantiene viva
+    
     # Security settings
     SECRET_KEY: str = "ludix-super-secret-key-for-development-only"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_CACHE_TTL: float = 5.0          # Segundos que se reutiliza un token verificado / usuario cargado
+    AUTH_CACHE_MAX_ENTRIES: int = 4096   # Entradas máximas por caché en memoria
     
     # File upload settings
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "uploads"
     
-    # External services
-    GOOGLE_CLIENT_ID: str = ""
-    GOOGLE_CLIENT_SECRET: str = ""
+    # External services (opcionales)
+    GOOGLE_CLIENT_ID: Optional[str] = None
+    GOOGLE_CLIENT_SECRET: Optional[str] = None
     
-    # Email settings (for notifications)
-    SMTP_HOST: str = ""
+    # Email settings (for notifications, opcionales)
+    SMTP_HOST: Optional[str] = None
     SMTP_PORT: int = 587
-    SMTP_USERNAME: str = ""
-    SMTP_PASSWORD: str = ""
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-        extra = "ignore"  # Ignorar campos extra
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
+        extra="ignore",  # Ignorar campos extra
+        frozen=True,            # Inmutable: se lee una sola vez y se comparte
+        validate_default=False  # Los valores por defecto no se revalidan al instanciar
+    )
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Obtener la configuración (el .env se parsea solo en la primera llamada)"""
+    return Settings()
 
-# Create settings instance
-settings = Settings()
+# Alias por compatibilidad con los módulos que importan `settings`
+settings = get_settings()
 
 # CORS origins (defined separately to avoid pydantic issues)
 ALLOWED_ORIGINS = [
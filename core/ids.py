@@ -0,0 +1,26 @@
+"""
+Generación de identificadores ordenados por tiempo (UUID versión 7)
+"""
+
+import os
+import time
+import uuid
+
+def uuid7() -> str:
+    """Generar un UUIDv7: prefijo de 48 bits con el tiempo Unix en ms + 74 bits aleatorios.
+
+    Al crecer con el tiempo, las inserciones caen al final del índice de la
+    clave primaria en lugar de en una hoja aleatoria (como con uuid4).
+    """
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    rand_a = rand >> 68                      # 12 bits
+    rand_b = rand & ((1 << 62) - 1)          # 62 bits
+    value = (
+        (unix_ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76                          # versión 7
+        | rand_a << 64
+        | 0b10 << 62                         # variante RFC 9562
+        | rand_b
+    )
+    return str(uuid.UUID(int=value))
@@ -0,0 +1,175 @@
+-- Enable RLS (Row Level Security)
+ALTER DATABASE postgres SET row_security = on;
+
+-- Users table (extends Supabase auth.users)
+CREATE TABLE IF NOT EXISTS public.users (
+    id UUID REFERENCES auth.users ON DELETE CASCADE PRIMARY KEY,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    full_name VARCHAR(255),
+    role VARCHAR(50) DEFAULT 'student' CHECK (role IN ('student', 'teacher', 'admin')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Classes table
+CREATE TABLE IF NOT EXISTS public.classes (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    teacher_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    code VARCHAR(10) UNIQUE NOT NULL, -- For students to join
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Class enrollments (many-to-many)
+CREATE TABLE IF NOT EXISTS public.class_enrollments (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    class_id UUID REFERENCES public.classes(id) ON DELETE CASCADE,
+    student_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    enrolled_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(class_id, student_id)
+);
+
+-- Quiz/Game content
+CREATE TABLE IF NOT EXISTS public.quizzes (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    questions JSONB NOT NULL, -- Store questions array
+    class_id UUID REFERENCES public.classes(id) ON DELETE CASCADE,
+    created_by UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    is_active BOOLEAN DEFAULT true,
+    time_limit INTEGER, -- in minutes
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Game sessions
+CREATE TABLE IF NOT EXISTS public.game_sessions (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    quiz_id UUID REFERENCES public.quizzes(id) ON DELETE CASCADE,
+    student_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    answers JSONB, -- Store student answers
+    score INTEGER DEFAULT 0,
+    max_score INTEGER DEFAULT 0,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    time_taken INTEGER, -- in seconds
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Progress tracking
+CREATE TABLE IF NOT EXISTS public.student_progress (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    student_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    class_id UUID REFERENCES public.classes(id) ON DELETE CASCADE,
+    total_quizzes INTEGER DEFAULT 0,
+    completed_quizzes INTEGER DEFAULT 0,
+    average_score DECIMAL(5,2) DEFAULT 0,
+    total_time_spent INTEGER DEFAULT 0, -- in seconds
+    last_activity TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(student_id, class_id)
+);
+
+-- Columns used by the API (class codes, capacity and each student's current class)
+ALTER TABLE public.classes ADD COLUMN IF NOT EXISTS class_code VARCHAR(10) UNIQUE;
+ALTER TABLE public.classes ADD COLUMN IF NOT EXISTS max_students INTEGER DEFAULT 30;
+ALTER TABLE public.users ADD COLUMN IF NOT EXISTS class_id UUID REFERENCES public.classes(id) ON DELETE SET NULL;
+
+-- Indexes for the most common lookups (Postgres does not index foreign keys automatically)
+CREATE INDEX IF NOT EXISTS idx_classes_teacher_id ON public.classes(teacher_id);
+CREATE INDEX IF NOT EXISTS idx_users_class_id ON public.users(class_id);
+CREATE INDEX IF NOT EXISTS idx_class_enrollments_student_id ON public.class_enrollments(student_id);
+CREATE INDEX IF NOT EXISTS idx_quizzes_class_id ON public.quizzes(class_id);
+CREATE INDEX IF NOT EXISTS idx_game_sessions_student_quiz ON public.game_sessions(student_id, quiz_id);
+CREATE INDEX IF NOT EXISTS idx_game_sessions_quiz_id ON public.game_sessions(quiz_id);
+CREATE INDEX IF NOT EXISTS idx_game_sessions_student_completed ON public.game_sessions(student_id)
+    WHERE completed_at IS NOT NULL;
+
+-- Unirse a una clase por código en una sola llamada (la fila de la clase se bloquea
+-- para que dos alumnos no superen max_students al unirse a la vez)
+CREATE OR REPLACE FUNCTION public.join_class_by_code(p_student_id UUID, p_class_code TEXT)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_class public.classes%ROWTYPE;
+BEGIN
+    SELECT * INTO v_class FROM public.classes
+    WHERE class_code = p_class_code AND is_active
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Class not found or inactive';
+    END IF;
+
+    IF v_class.max_students IS NOT NULL AND (
+        SELECT COUNT(*) FROM public.users
+        WHERE class_id = v_class.id AND id <> p_student_id
+    ) >= v_class.max_students THEN
+        RAISE EXCEPTION 'Class is full';
+    END IF;
+
+    UPDATE public.users SET class_id = v_class.id, updated_at = NOW()
+    WHERE id = p_student_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Failed to update student';
+    END IF;
+
+    RETURN to_jsonb(v_class);
+END;
+$$;
+
+-- Enable RLS policies
+ALTER TABLE public.users ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.classes ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.class_enrollments ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.quizzes ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.game_sessions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.student_progress ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policies
+-- Users can read their own data
+CREATE POLICY "Users can view own profile" ON public.users
+    FOR SELECT USING (auth.uid() = id);
+
+CREATE POLICY "Users can update own profile" ON public.users
+    FOR UPDATE USING (auth.uid() = id);
+
+-- Teachers can manage their classes
+CREATE POLICY "Teachers can manage own classes" ON public.classes
+    FOR ALL USING (auth.uid() = teacher_id);
+
+-- Students can view classes they're enrolled in
+CREATE POLICY "Students can view enrolled classes" ON public.classes
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM public.class_enrollments 
+            WHERE class_id = id AND student_id = auth.uid()
+        )
+    );
+
+-- Functions to update timestamps
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Triggers for updated_at
+CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON public.users
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_classes_updated_at BEFORE UPDATE ON public.classes
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_quizzes_updated_at BEFORE UPDATE ON public.quizzes
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_student_progress_updated_at BEFORE UPDATE ON public.student_progress
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,54 @@
+"""
+Hash y verificación de contraseñas (bcrypt, con compatibilidad para hashes sha256 antiguos)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# Costo de bcrypt: ~60-190 ms por hash en el servidor
+BCRYPT_ROUNDS = 10
+
+# bcrypt solo usa los primeros 72 bytes de la contraseña
+_BCRYPT_MAX_BYTES = 72
+
+# bcrypt libera el GIL mientras calcula: un hilo por núcleo alcanza para hashear en paralelo
+HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:_BCRYPT_MAX_BYTES]
+
+def hash_password(password: str) -> str:
+    """Generar hash bcrypt de una contraseña"""
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("ascii")
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """Verificar contraseña contra un hash bcrypt o un sha256 hex heredado"""
+    if not hashed_password:
+        return False
+
+    if hashed_password.startswith("$2"):
+        try:
+            return bcrypt.checkpw(_password_bytes(password), hashed_password.encode("ascii"))
+        except ValueError:
+            return False
+
+    # Usuarios creados antes de bcrypt: sha256 hex sin sal
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(legacy, hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Indica si el hash es del formato antiguo y conviene regenerarlo con bcrypt"""
+    return not hashed_password.startswith("$2")
+
+async def hash_password_async(password: str) -> str:
+    """hash_password fuera del event loop"""
+    return await asyncio.get_running_loop().run_in_executor(HASH_POOL, hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """verify_password fuera del event loop"""
+    return await asyncio.get_running_loop().run_in_executor(HASH_POOL, verify_password, password, hashed_password)
@@ -1,164 +1,100 @@
 from supabase import create_client, Client
-from core.config import settings
+from postgrest import SyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_TIMEOUT
+from postgrest.utils import SyncClient
+from core.config import get_settings
+from functools import lru_cache
+from pathlib import Path
+import httpx
 import os
+import threading
 
-# Supabase client instance
+# Supabase client instances (uno por proceso)
 supabase: Client = None
+supabase_admin: Client = None
+_clients_lock = threading.Lock()
+
+# Reintentos de conexión del transporte httpx (fallos de conexión, no respuestas HTTP)
+HTTP_TRANSPORT_RETRIES = 3
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """Cliente PostgREST cuya sesión httpx usa un pool de conexiones dimensionado desde settings"""
+    
+    def create_session(self, base_url, headers, timeout) -> SyncClient:
+        settings = get_settings()
+        limits = httpx.Limits(
+            max_connections=settings.SUPABASE_POOL_SIZE + settings.SUPABASE_POOL_MAX_OVERFLOW,
+            max_keepalive_connections=settings.SUPABASE_POOL_SIZE,
+            keepalive_expiry=settings.SUPABASE_POOL_RECYCLE
+        )
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(timeout, pool=settings.SUPABASE_POOL_TIMEOUT),
+            transport=httpx.HTTPTransport(limits=limits, retries=HTTP_TRANSPORT_RETRIES)
+        )
+
+def _init_pooled_postgrest_client(rest_url: str, headers: dict, schema: str,
+                                  timeout=DEFAULT_POSTGREST_CLIENT_TIMEOUT) -> SyncPostgrestClient:
+    """Reemplazo de Client._init_postgrest_client que crea el cliente PostgREST con pool"""
+    return PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+def _create_pooled_client(supabase_url: str, supabase_key: str) -> Client:
+    """Crear cliente Supabase cuyas consultas a tablas reutilizan conexiones HTTP"""
+    client = create_client(supabase_url, supabase_key)
+    # El cliente PostgREST se crea de forma perezosa; solo cambiamos cómo se construye
+    client._init_postgrest_client = _init_pooled_postgrest_client
+    return client
 
 def get_supabase_client() -> Client:
     """Get Supabase client instance"""
     global supabase
     
     if supabase is None:
-        if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
-            raise ValueError(
-                "SUPABASE_URL and SUPABASE_KEY must be set in environment variables"
-            )
-        
-        supabase = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_KEY
-        )
+        with _clients_lock:
+            if supabase is None:
+                settings = get_settings()
+                if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+                    raise ValueError(
+                        "SUPABASE_URL and SUPABASE_KEY must be set in environment variables"
+                    )
+                
+                supabase = _create_pooled_client(
+                    settings.SUPABASE_URL,
+                    settings.SUPABASE_KEY
+                )
     
     return supabase
 
 def get_supabase_admin_client() -> Client:
     """Get Supabase admin client with service key"""
-    if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
-        raise ValueError(
-            "SUPABASE_URL and SUPABASE_SERVICE_KEY must be set for admin operations"
-        )
+    global supabase_admin
     
-    return create_client(
-        settings.SUPABASE_URL,
-        settings.SUPABASE_SERVICE_KEY
-    )
-
-# SQL Schema for Supabase tables
-LUDIX_SCHEMA = """
--- Enable RLS (Row Level Security)
-ALTER DATABASE postgres SET row_security = on;
-
--- Users table (extends Supabase auth.users)
-CREATE TABLE IF NOT EXISTS public.users (
-    id UUID REFERENCES auth.users ON DELETE CASCADE PRIMARY KEY,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    full_name VARCHAR(255),
-    role VARCHAR(50) DEFAULT 'student' CHECK (role IN ('student', 'teacher', 'admin')),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Classes table
-CREATE TABLE IF NOT EXISTS public.classes (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    description TEXT,
-    teacher_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
-    code VARCHAR(10) UNIQUE NOT NULL, -- For students to join
-    is_active BOOLEAN DEFAULT true,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Class enrollments (many-to-many)
-CREATE TABLE IF NOT EXISTS public.class_enrollments (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-    class_id UUID REFERENCES public.classes(id) ON DELETE CASCADE,
-    student_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
-    enrolled_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    UNIQUE(class_id, student_id)
-);
-
--- Quiz/Game content
-CREATE TABLE IF NOT EXISTS public.quizzes (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-    title VARCHAR(255) NOT NULL,
-    description TEXT,
-    questions JSONB NOT NULL, -- Store questions array
-    class_id UUID REFERENCES public.classes(id) ON DELETE CASCADE,
-    created_by UUID REFERENCES public.users(id) ON DELETE CASCADE,
-    is_active BOOLEAN DEFAULT true,
-    time_limit INTEGER, -- in minutes
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Game sessions
-CREATE TABLE IF NOT EXISTS public.game_sessions (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-    quiz_id UUID REFERENCES public.quizzes(id) ON DELETE CASCADE,
-    student_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
-    answers JSONB, -- Store student answers
-    score INTEGER DEFAULT 0,
-    max_score INTEGER DEFAULT 0,
-    completed_at TIMESTAMP WITH TIME ZONE,
-    time_taken INTEGER, -- in seconds
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Progress tracking
-CREATE TABLE IF NOT EXISTS public.student_progress (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-    student_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
-    class_id UUID REFERENCES public.classes(id) ON DELETE CASCADE,
-    total_quizzes INTEGER DEFAULT 0,
-    completed_quizzes INTEGER DEFAULT 0,
-    average_score DECIMAL(5,2) DEFAULT 0,
-    total_time_spent INTEGER DEFAULT 0, -- in seconds
-    last_activity TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    UNIQUE(student_id, class_id)
-);
-
--- Enable RLS policies
-ALTER TABLE public.users ENABLE ROW LEVEL SECURITY;
-ALTER TABLE public.classes ENABLE ROW LEVEL SECURITY;
-ALTER TABLE public.class_enrollments ENABLE ROW LEVEL SECURITY;
-ALTER TABLE public.quizzes ENABLE ROW LEVEL SECURITY;
-ALTER TABLE public.game_sessions ENABLE ROW LEVEL SECURITY;
-ALTER TABLE public.student_progress ENABLE ROW LEVEL SECURITY;
-
--- RLS Policies
--- Users can read their own data
-CREATE POLICY "Users can view own profile" ON public.users
-    FOR SELECT USING (auth.uid() = id);
-
-CREATE POLICY "Users can update own profile" ON public.users
-    FOR UPDATE USING (auth.uid() = id);
-
--- Teachers can manage their classes
-CREATE POLICY "Teachers can manage own classes" ON public.classes
-    FOR ALL USING (auth.uid() = teacher_id);
-
--- Students can view classes they're enrolled in
-CREATE POLICY "Students can view enrolled classes" ON public.classes
-    FOR SELECT USING (
-        EXISTS (
-            SELECT 1 FROM public.class_enrollments 
-            WHERE class_id = id AND student_id = auth.uid()
-        )
-    );
-
--- Functions to update timestamps
-CREATE OR REPLACE FUNCTION update_updated_at_column()
-RETURNS TRIGGER AS $$
-BEGIN
-    NEW.updated_at = NOW();
-    RETURN NEW;
-END;
-$$ language 'plpgsql';
-
--- Triggers for updated_at
-CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON public.users
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_classes_updated_at BEFORE UPDATE ON public.classes
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-
-CREATE TRIGGER update_quizzes_updated_at BEFORE UPDATE ON public.quizzes
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+    if supabase_admin is None:
+        with _clients_lock:
+            if supabase_admin is None:
+                settings = get_settings()
+                if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
+                    raise ValueError(
+                        "SUPABASE_URL and SUPABASE_SERVICE_KEY must be set for admin operations"
+                    )
+                
+                supabase_admin = _create_pooled_client(
+                    settings.SUPABASE_URL,
+                    settings.SUPABASE_SERVICE_KEY
+                )
+    
+    return supabase_admin
 
-CREATE TRIGGER update_student_progress_updated_at BEFORE UPDATE ON public.student_progress
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
-"""
+def reset_supabase_clients() -> None:
+    """Descartar los clientes cacheados (útil en tests o tras cambiar credenciales)"""
+    global supabase, supabase_admin
+    
+    with _clients_lock:
+        supabase = None
+        supabase_admin = None
+
+@lru_cache(maxsize=1)
+def load_ludix_schema() -> str:
+    """Leer el esquema SQL de Ludix (core/ludix_schema.sql) solo cuando se necesita"""
+    return (Path(__file__).parent / "ludix_schema.sql").read_text(encoding="utf-8")
@@ -2,12 +2,81 @@
 Script para consultar los valores de enums directamente desde Supabase
 """
 
+import asyncio
+import logging
+import os
+
 from services.supabase_service import supabase_service
 
-def query_enum_values():
-    """Consultar los valores de enums desde Supabase"""
+log = logging.getLogger(__name__)
+
+# Máximo de consultas de diagnóstico en paralelo contra Supabase
+MAX_CONCURRENT_QUERIES = 8
+
+# Función SQL (ejecutar una vez en el SQL Editor de Supabase) que devuelve
+# los tres diagnósticos en un único round trip
+DIAG_ENUMS_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION diag_enums() RETURNS json AS $$
+    SELECT json_build_object(
+        'enums', (
+            SELECT json_agg(t) FROM (
+                SELECT t.typname AS enum_name, e.enumlabel AS enum_value
+                FROM pg_type t
+                JOIN pg_enum e ON t.oid = e.enumtypid
+                WHERE t.typname IN ('difficultylevel', 'questiontype', 'userrole', 'sessionstatus')
+                ORDER BY t.typname, e.enumsortorder
+            ) t
+        ),
+        'difficulties', (SELECT json_agg(DISTINCT difficulty) FROM quizzes WHERE difficulty IS NOT NULL),
+        'roles', (SELECT json_agg(DISTINCT role) FROM users WHERE role IS NOT NULL)
+    )
+$$ LANGUAGE sql STABLE;
+"""
+
+def _run_enum_query(i: int, query: str) -> list:
+    """Ejecutar una consulta de diagnóstico y devolver las líneas a mostrar"""
+    lines = [f"\n📋 Ejecutando consulta {i+1}..."]
+    client = supabase_service.client
+    table = client.table
+    try:
+        result = client.rpc('query_enums', {'query_text': query}).execute()
+        lines.append(f"   Resultado: {result}")
+    except Exception as e:
+        lines.append(f"   ❌ Error en consulta {i+1}: {e}")
+        
+        # Intentar consulta directa
+        try:
+            if i == 1:  # Query de difficulty
+                result = table("quizzes").select("difficulty").not_.is_("difficulty", "null").limit(10).execute()
+                lines.append(f"   Difficulty values: {list(dict.fromkeys(r['difficulty'] for r in result.data))}")
+        except Exception as e2:
+            lines.append(f"   ❌ Error en consulta directa: {e2}")
+            
+        try:
+            if i == 2:  # Query de role
+                result = table("users").select("role").not_.is_("role", "null").limit(10).execute()
+                lines.append(f"   Role values: {set(r['role'] for r in result.data)}")
+        except Exception as e2:
+            lines.append(f"   ❌ Error en consulta directa: {e2}")
+    
+    return lines
+
+async def query_enum_values():
+    """Consultar los valores de enums desde Supabase (consultas en paralelo)"""
     print("🔍 Consultando valores de enums en Supabase...")
     
+    # Intentar primero la función diag_enums: un solo request para todo
+    try:
+        result = await asyncio.to_thread(supabase_service.client.rpc("diag_enums", {}).execute)
+        diag = result.data or {}
+        print(f"\n📋 Enums: {diag.get('enums')}")
+        print(f"   Difficulty values: {diag.get('difficulties')}")
+        print(f"   Role values: {diag.get('roles')}")
+        return
+    except Exception as e:
+        print(f"   ⚠️ diag_enums no disponible ({e}), usando consultas individuales")
+        print("   (crear la función con DIAG_ENUMS_FUNCTION_SQL de este script)")
+    
     try:
         # Query para obtener los valores de los enums
         queries = [
@@ -40,28 +109,25 @@ def query_enum_values():
             """
         ]
         
-        for i, query in enumerate(queries):
-            print(f"\n📋 Ejecutando consulta {i+1}...")
-            try:
-                result = supabase_service.client.rpc('query_enums', {'query_text': query}).execute()
-                print(f"   Resultado: {result}")
-            except Exception as e:
-                print(f"   ❌ Error en consulta {i+1}: {e}")
-                
-                # Intentar consulta directa
-                try:
-                    if i == 1:  # Query de difficulty
-                        result = supabase_service.client.table("quizzes").select("difficulty").limit(10).execute()
-                        print(f"   Difficulty values: {[r.get('difficulty') for r in result.data if r.get('difficulty')]}")
-                except Exception as e2:
-                    print(f"   ❌ Error en consulta directa: {e2}")
-                    
-                try:
-                    if i == 2:  # Query de role
-                        result = supabase_service.client.table("users").select("role").limit(10).execute()
-                        print(f"   Role values: {set(r.get('role') for r in result.data if r.get('role'))}")
-                except Exception as e2:
-                    print(f"   ❌ Error en consulta directa: {e2}")
+        # Las consultas son independientes: el cliente es síncrono, así que se lanzan en hilos
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+        
+        async def run(i: int, query: str) -> list:
+            async with semaphore:
+                return await asyncio.to_thread(_run_enum_query, i, query)
+        
+        results = await asyncio.gather(
+            *(run(i, query) for i, query in enumerate(queries)),
+            return_exceptions=True
+        )
+        
+        # Mostrar en el orden original de las consultas
+        for i, lines in enumerate(results):
+            if isinstance(lines, Exception):
+                print(f"\n❌ Error en consulta {i+1}: {lines}")
+                continue
+            for line in lines:
+                print(line)
     
     except Exception as e:
         print(f"❌ Error general: {e}")
@@ -70,9 +136,11 @@ def test_simple_quiz_creation():
     """Probar crear un quiz sin enums complicados"""
     print("\n🧪 Probando creación simple de quiz...")
     
+    table = supabase_service.client.table
+    
     try:
         # Obtener una clase existente
-        classes_result = supabase_service.client.table("classes").select("*").limit(1).execute()
+        classes_result = table("classes").select("*").limit(1).execute()
         if not classes_result.data:
             print("❌ No hay clases disponibles")
             return
@@ -97,7 +165,7 @@ def test_simple_quiz_creation():
             # NO incluir difficulty, question_type, etc.
         }
         
-        result = supabase_service.client.table("quizzes").insert(quiz_data).execute()
+        result = table("quizzes").insert(quiz_data).execute()
         
         if result.data:
             print("✅ Quiz simple creado exitosamente!")
@@ -116,16 +184,16 @@ def test_simple_quiz_creation():
                 # NO incluir question_type, difficulty
             }
             
-            question_result = supabase_service.client.table("questions").insert(question_data).execute()
+            question_result = table("questions").insert(question_data).execute()
             
             if question_result.data:
                 print("✅ Pregunta simple creada exitosamente!")
                 
                 # Verificar que se guardó
-                verify_quiz = supabase_service.client.table("quizzes").select("*").eq("id", quiz_id).execute()
+                verify_quiz = table("quizzes").select("*").eq("id", quiz_id).execute()
                 print(f"📋 Quiz verificado: {verify_quiz.data[0] if verify_quiz.data else 'No encontrado'}")
                 
-                verify_question = supabase_service.client.table("questions").select("*").eq("id", "test-question-123").execute()
+                verify_question = table("questions").select("*").eq("id", "test-question-123").execute()
                 print(f"📋 Pregunta verificada: {verify_question.data[0] if verify_question.data else 'No encontrada'}")
                 
             else:
@@ -135,9 +203,9 @@ def test_simple_quiz_creation():
             
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Falló la prueba de creación simple de quiz")
 
 if __name__ == "__main__":
-    query_enum_values()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+    asyncio.run(query_enum_values())
     test_simple_quiz_creation()
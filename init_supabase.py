@@ -5,7 +5,7 @@ Script para inicializar el esquema de base de datos en Supabase
 
 import os
 import sys
-from core.supabase_client import get_supabase_admin_client, LUDIX_SCHEMA
+from core.supabase_client import get_supabase_admin_client, load_ludix_schema
 from core.config import settings
 
 def init_supabase_schema():
@@ -40,7 +40,7 @@ def init_supabase_schema():
         print("=" * 60)
         print("ESQUEMA SQL PARA COPIAR:")
         print("=" * 60)
-        print(LUDIX_SCHEMA)
+        print(load_ludix_schema())
         print("=" * 60)
         print()
         
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import uvicorn
 
@@ -13,27 +14,23 @@ from routers import (
     init_data
 )
 from core.config import settings, ALLOWED_ORIGINS
-from services.supabase_service import supabase_service
 
 # Security scheme se maneja en cada router
 
 # App startup/shutdown with Supabase only
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize Supabase connection on startup
     print("🚀 Iniciando Ludix API con Supabase...")
+    # La conexión HTTP con Supabase se abre en la primera consulta (pool compartido),
+    # así que el arranque no bloquea el event loop esperando a la red
     try:
-        # Test Supabase connection
-        client = supabase_service.client
-        print("✅ Conexión con Supabase establecida")
-        
         # Inicializar sistema Observer Pattern
         from patterns.observer_system import initialize_observer_system
         event_manager = initialize_observer_system()
         print("✅ Sistema Observer Pattern inicializado")
         
     except Exception as e:
-        print(f"⚠️ Error conectando con Supabase: {e}")
+        print(f"⚠️ Error inicializando Observer Pattern: {e}")
         
     yield
     
@@ -46,15 +43,16 @@ app = FastAPI(
     title="Ludix API Server",
     description="Backend API para la plataforma educativa Ludix",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Serialización JSON con orjson
 )
 
-# CORS middleware
+# CORS middleware (frozenset: la verificación del Origin en cada request es O(1))
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS,
+    allow_origins=frozenset(ALLOWED_ORIGINS),
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
+    allow_methods=("GET", "POST", "PUT", "DELETE", "PATCH"),
     allow_headers=["*"],
 )
 
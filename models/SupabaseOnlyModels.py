@@ -1,5 +1,5 @@
 # Ludix App Models - Supabase Only (No SQLAlchemy)
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -66,8 +66,7 @@ class User(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ClassroomBase(BaseModel):
     """Base Classroom model"""
@@ -87,8 +86,7 @@ class Classroom(ClassroomBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class GameBase(BaseModel):
     """Base Game model"""
@@ -110,8 +108,7 @@ class Game(GameBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class QuestionBase(BaseModel):
     """Base Question model"""
@@ -132,8 +129,7 @@ class Question(QuestionBase):
     id: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class GameSessionBase(BaseModel):
     """Base GameSession model"""
@@ -156,8 +152,7 @@ class GameSession(GameSessionBase):
     time_spent: Optional[int] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AnswerBase(BaseModel):
     """Base Answer model"""
@@ -176,8 +171,7 @@ class Answer(AnswerBase):
     id: str
     answered_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # AUTH MODELS
 class Token(BaseModel):
@@ -213,11 +207,11 @@ class HealthCheck(BaseModel):
     service: str = "Ludix API"
 
 # MASCOT INFO
-AVAILABLE_MASCOTS = [
+AVAILABLE_MASCOTS = (
     {"id": "pollito", "name": "Pollito", "description": "Un pollito amarillo muy tierno"},
     {"id": "gato", "name": "Gato", "description": "Un gato naranja muy juguetón"},
     {"id": "perro", "name": "Perro", "description": "Un perro fiel y amigable"},
     {"id": "dino", "name": "Dino", "description": "Un dinosaurio verde muy aventurero"},
     {"id": "jabali", "name": "Jabalí", "description": "Un jabalí valiente y fuerte"},
     {"id": "carpi", "name": "Carpi", "description": "Un carpincho relajado y sabio"},
-]
+)
@@ -4,11 +4,28 @@ Permite notificar automáticamente cuando ocurren eventos importantes
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, ClassVar, FrozenSet
 from enum import Enum
-from datetime import datetime
+from datetime import date, datetime
+from collections import Counter, OrderedDict, defaultdict, deque
+from dataclasses import asdict, dataclass
+from itertools import count, islice
 import asyncio
 import json
+import logging
+import os
+import time
+
+log = logging.getLogger("ludix.events")
+
+# Máximo de eventos retenidos en memoria (ring buffer, los más viejos se descartan)
+EVENT_HISTORY_MAXLEN = int(os.getenv("LUDIX_EVENT_HISTORY", "10000"))
+
+# Días de usuarios activos que conserva AnalyticsTracker
+DAU_RETENTION_DAYS = 30
+
+# Máximo de notificaciones retenidas por NotificationService
+NOTIFICATIONS_MAXLEN = 5000
 
 class EventType(Enum):
     """Tipos de eventos del sistema"""
@@ -27,20 +44,33 @@ class EventType(Enum):
 class Event:
     """Clase que representa un evento del sistema"""
     
+    # Sin __dict__ por instancia: se crean eventos en cada acción del usuario
+    __slots__ = ("id", "event_type", "event_type_value", "data", "user_id", "metadata", "_ts_ns")
+    
+    # Contador global: garantiza ids únicos aunque coincida el instante
+    _next_seq = count().__next__
+    
     def __init__(self, event_type: EventType, data: Dict[str, Any], 
                  user_id: Optional[str] = None, metadata: Optional[Dict] = None):
-        self.id = f"evt_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(self)}"
+        self._ts_ns = time.time_ns()
+        self.id = f"evt_{self._ts_ns}_{Event._next_seq()}"
         self.event_type = event_type
+        self.event_type_value = event_type.value
         self.data = data
         self.user_id = user_id
         self.metadata = metadata or {}
-        self.timestamp = datetime.now().isoformat()
+    
+    @property
+    def timestamp(self) -> str:
+        """Fecha ISO del evento (se formatea solo cuando se pide)"""
+        seconds, ns = divmod(self._ts_ns, 1_000_000_000)
+        return datetime.fromtimestamp(seconds).replace(microsecond=ns // 1000).isoformat()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el evento a diccionario"""
         return {
             "id": self.id,
-            "event_type": self.event_type.value,
+            "event_type": self.event_type_value,
             "data": self.data,
             "user_id": self.user_id,
             "metadata": self.metadata,
@@ -48,20 +78,22 @@ class Event:
         }
     
     def __str__(self):
-        return f"Event({self.event_type.value}, user={self.user_id}, time={self.timestamp})"
+        return f"Event({self.event_type_value}, user={self.user_id}, time={self.timestamp})"
 
 class Observer(ABC):
     """Interface para observadores"""
     
+    # Tipos de evento que escucha el observador (constante por clase)
+    INTERESTED: ClassVar[FrozenSet[EventType]] = frozenset()
+    
     @abstractmethod
     async def update(self, event: Event) -> None:
         """Método llamado cuando ocurre un evento"""
         pass
     
-    @abstractmethod
     def get_interested_events(self) -> List[EventType]:
         """Retorna los tipos de eventos en los que está interesado este observador"""
-        pass
+        return list(self.INTERESTED)
     
     @abstractmethod
     def get_observer_name(self) -> str:
@@ -95,33 +127,47 @@ class EventManager(Subject):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.observers = []
-            cls._instance.event_history = []
+            # Índice EventType -> observers interesados (se arma en attach/detach)
+            cls._instance._interested = defaultdict(list)
+            cls._instance.event_history = deque(maxlen=EVENT_HISTORY_MAXLEN)
         return cls._instance
     
     def attach(self, observer: Observer) -> None:
         """Adjuntar un observador"""
         if observer not in self.observers:
             self.observers.append(observer)
-            print(f"🔗 Observer '{observer.get_observer_name()}' adjuntado")
+            for event_type in observer.get_interested_events():
+                self._interested[event_type].append(observer)
+            log.debug("🔗 Observer '%s' adjuntado", observer.get_observer_name())
     
     def detach(self, observer: Observer) -> None:
         """Quitar un observador"""
         if observer in self.observers:
             self.observers.remove(observer)
-            print(f"🔓 Observer '{observer.get_observer_name()}' removido")
+            for event_type in observer.get_interested_events():
+                bucket = self._interested.get(event_type)
+                if bucket and observer in bucket:
+                    bucket.remove(observer)
+            log.debug("🔓 Observer '%s' removido", observer.get_observer_name())
     
     async def notify(self, event: Event) -> None:
         """Notificar a observadores interesados en este tipo de evento"""
         self.event_history.append(event)
         
-        print(f"📢 Evento emitido: {event}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("📢 Evento emitido: %s", event)
         
-        for observer in self.observers:
-            if event.event_type in observer.get_interested_events():
-                try:
-                    await observer.update(event)
-                except Exception as e:
-                    print(f"❌ Error en observer {observer.get_observer_name()}: {e}")
+        # Los observers son independientes: se ejecutan en paralelo
+        async with asyncio.TaskGroup() as tg:
+            for observer in self._interested.get(event.event_type, ()):
+                tg.create_task(self._safe_update(observer, observer.update(event)))
+    
+    async def _safe_update(self, observer: Observer, update) -> None:
+        """Ejecutar update capturando errores para no cancelar al resto del TaskGroup"""
+        try:
+            await update
+        except Exception as e:
+            log.error("❌ Error en observer %s: %s", observer.get_observer_name(), e)
     
     async def emit_event(self, event_type: EventType, data: Dict[str, Any], 
                         user_id: Optional[str] = None, metadata: Optional[Dict] = None) -> None:
@@ -131,48 +177,60 @@ class EventManager(Subject):
     
     def get_event_history(self, limit: int = 50) -> List[Event]:
         """Obtener historial de eventos"""
-        return self.event_history[-limit:]
+        start = max(0, len(self.event_history) - limit)
+        return list(islice(self.event_history, start, None))
     
     def get_observers_count(self) -> int:
         """Obtener número de observadores registrados"""
         return len(self.observers)
 
+# Instancia única del gestor: usar esta referencia en lugar de llamar EventManager()
+event_manager = EventManager()
+
 # === IMPLEMENTACIONES CONCRETAS DE OBSERVERS ===
 
 class ProgressTracker(Observer):
     """Observer que rastrea el progreso de los estudiantes"""
     
+    INTERESTED = frozenset({
+        EventType.GAME_SESSION_COMPLETED,
+        EventType.ANSWER_SUBMITTED,
+        EventType.ACHIEVEMENT_UNLOCKED
+    })
+    
     def __init__(self):
         self.student_progress = {}
     
     async def update(self, event: Event) -> None:
         """Actualizar progreso según el evento"""
-        if event.event_type == EventType.GAME_SESSION_COMPLETED:
-            student_id = event.user_id
-            score = event.data.get('score', 0)
-            
-            if student_id not in self.student_progress:
-                self.student_progress[student_id] = {
-                    'total_games': 0,
-                    'total_score': 0,
-                    'best_score': 0,
-                    'last_activity': None
-                }
-            
-            progress = self.student_progress[student_id]
-            progress['total_games'] += 1
-            progress['total_score'] += score
-            progress['best_score'] = max(progress['best_score'], score)
-            progress['last_activity'] = event.timestamp
-            
-            print(f"📊 Progreso actualizado para estudiante {student_id}: {progress}")
+        handler = self._HANDLERS.get(event.event_type)
+        if handler:
+            handler(self, event)
     
-    def get_interested_events(self) -> List[EventType]:
-        return [
-            EventType.GAME_SESSION_COMPLETED,
-            EventType.ANSWER_SUBMITTED,
-            EventType.ACHIEVEMENT_UNLOCKED
-        ]
+    def _on_game_completed(self, event: Event) -> None:
+        student_id = event.user_id
+        score = event.data.get('score', 0)
+        
+        if student_id not in self.student_progress:
+            self.student_progress[student_id] = {
+                'total_games': 0,
+                'total_score': 0,
+                'best_score': 0,
+                'last_activity': None
+            }
+        
+        progress = self.student_progress[student_id]
+        progress['total_games'] += 1
+        progress['total_score'] += score
+        progress['best_score'] = max(progress['best_score'], score)
+        progress['last_activity'] = event.timestamp
+        
+        log.debug("📊 Progreso actualizado para estudiante %s: %s", student_id, progress)
+    
+    # Tipo de evento -> handler (un lookup en lugar de una cadena de if/elif)
+    _HANDLERS = {
+        EventType.GAME_SESSION_COMPLETED: _on_game_completed
+    }
     
     def get_observer_name(self) -> str:
         return "ProgressTracker"
@@ -184,6 +242,12 @@ class ProgressTracker(Observer):
 class AchievementSystem(Observer):
     """Observer que maneja logros y insignias"""
     
+    INTERESTED = frozenset({
+        EventType.GAME_SESSION_COMPLETED,
+        EventType.STUDENT_JOINED_CLASS,
+        EventType.USER_REGISTERED
+    })
+    
     def __init__(self):
         self.achievements = {
             'first_game': {'name': 'Primer Juego', 'description': 'Completó su primer juego'},
@@ -192,7 +256,10 @@ class AchievementSystem(Observer):
             'persistent': {'name': 'Persistente', 'description': 'Jugó 10 juegos'},
             'class_joiner': {'name': 'Socializer', 'description': 'Se unió a una clase'}
         }
-        self.user_achievements = {}
+        self.user_achievements = defaultdict(set)  # user_id -> ids de logros obtenidos
+        self._manager = event_manager
+        # Emisiones de logros en curso (referencia fuerte para que no las recolecte el GC)
+        self._pending = set()
     
     async def update(self, event: Event) -> None:
         """Verificar si se desbloqueó algún logro"""
@@ -200,150 +267,206 @@ class AchievementSystem(Observer):
         if not user_id:
             return
         
-        if user_id not in self.user_achievements:
-            self.user_achievements[user_id] = []
+        handler = self._HANDLERS.get(event.event_type)
+        if not handler:
+            return
         
-        unlocked = []
+        earned = self.user_achievements[user_id]
+        unlocked = handler(self, event, earned)
         
-        if event.event_type == EventType.GAME_SESSION_COMPLETED:
-            # Primer juego
-            if 'first_game' not in self.user_achievements[user_id]:
-                unlocked.append('first_game')
+        # Agregar logros desbloqueados
+        for achievement_id in unlocked:
+            earned.add(achievement_id)
+            
+            # Emitir evento de logro desbloqueado como tarea aparte (sin re-entrar en notify)
+            task = asyncio.create_task(self._manager.emit_event(
+                EventType.ACHIEVEMENT_UNLOCKED,
+                {
+                    'achievement_id': achievement_id,
+                    'achievement': self.achievements[achievement_id]
+                },
+                user_id
+            ))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
             
-            # Puntuación perfecta
-            score = event.data.get('score', 0)
-            total_questions = event.data.get('total_questions', 1)
-            if score == total_questions * 10 and 'perfect_score' not in self.user_achievements[user_id]:
-                unlocked.append('perfect_score')
+            log.debug("🏆 ¡Logro desbloqueado! %s para usuario %s",
+                      self.achievements[achievement_id]['name'], user_id)
+    
+    def _check_game_completed(self, event: Event, earned: set) -> List[str]:
+        unlocked = []
         
-        elif event.event_type == EventType.STUDENT_JOINED_CLASS:
-            if 'class_joiner' not in self.user_achievements[user_id]:
-                unlocked.append('class_joiner')
+        # Primer juego
+        if 'first_game' not in earned:
+            unlocked.append('first_game')
         
-        # Agregar logros desbloqueados
-        for achievement_id in unlocked:
-            if achievement_id not in self.user_achievements[user_id]:
-                self.user_achievements[user_id].append(achievement_id)
-                
-                # Emitir evento de logro desbloqueado
-                await EventManager().emit_event(
-                    EventType.ACHIEVEMENT_UNLOCKED,
-                    {
-                        'achievement_id': achievement_id,
-                        'achievement': self.achievements[achievement_id]
-                    },
-                    user_id
-                )
-                
-                print(f"🏆 ¡Logro desbloqueado! {self.achievements[achievement_id]['name']} para usuario {user_id}")
+        # Puntuación perfecta
+        score = event.data.get('score', 0)
+        total_questions = event.data.get('total_questions', 1)
+        if score == total_questions * 10 and 'perfect_score' not in earned:
+            unlocked.append('perfect_score')
+        
+        return unlocked
     
-    def get_interested_events(self) -> List[EventType]:
-        return [
-            EventType.GAME_SESSION_COMPLETED,
-            EventType.STUDENT_JOINED_CLASS,
-            EventType.USER_REGISTERED
-        ]
+    def _check_joined_class(self, event: Event, earned: set) -> List[str]:
+        return [] if 'class_joiner' in earned else ['class_joiner']
+    
+    # Tipo de evento -> función que devuelve los logros recién desbloqueados
+    _HANDLERS = {
+        EventType.GAME_SESSION_COMPLETED: _check_game_completed,
+        EventType.STUDENT_JOINED_CLASS: _check_joined_class
+    }
     
     def get_observer_name(self) -> str:
         return "AchievementSystem"
+    
+    def get_user_achievements(self, user_id: str) -> List[str]:
+        """Obtener los logros de un usuario (ordenados)"""
+        return sorted(self.user_achievements.get(user_id, ()))
+    
+    async def wait_pending(self) -> None:
+        """Esperar a que terminen las emisiones de logros pendientes"""
+        while self._pending:
+            await asyncio.gather(*self._pending)
+
+@dataclass(slots=True)
+class Notification:
+    """Notificación enviada a un usuario"""
+    user_id: Optional[str]
+    title: str
+    message: str
+    type: str
+    timestamp: str
+    event_id: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte la notificación a diccionario"""
+        return asdict(self)
 
 class NotificationService(Observer):
     """Observer que maneja notificaciones push/email"""
     
+    INTERESTED = frozenset({
+        EventType.STUDENT_JOINED_CLASS,
+        EventType.ACHIEVEMENT_UNLOCKED,
+        EventType.QUIZ_CREATED,
+        EventType.GAME_SESSION_COMPLETED
+    })
+    
     def __init__(self):
-        self.notifications_sent = []
+        self.notifications_sent = deque(maxlen=NOTIFICATIONS_MAXLEN)
     
     async def update(self, event: Event) -> None:
         """Enviar notificaciones según el evento"""
-        notification = None
-        
-        if event.event_type == EventType.STUDENT_JOINED_CLASS:
-            class_name = event.data.get('class_name', 'una clase')
-            notification = {
-                'user_id': event.user_id,
-                'title': '¡Bienvenido a la clase!',
-                'message': f'Te has unido exitosamente a {class_name}',
-                'type': 'success'
-            }
-        
-        elif event.event_type == EventType.ACHIEVEMENT_UNLOCKED:
-            achievement = event.data.get('achievement', {})
-            notification = {
-                'user_id': event.user_id,
-                'title': '🏆 ¡Nuevo logro!',
-                'message': f'Has desbloqueado: {achievement.get("name", "Logro")}',
-                'type': 'achievement'
-            }
-        
-        elif event.event_type == EventType.QUIZ_CREATED:
-            notification = {
-                'user_id': event.user_id,
-                'title': '📝 Nuevo quiz disponible',
-                'message': f'Se ha creado el quiz: {event.data.get("title", "Sin título")}',
-                'type': 'info'
-            }
+        handler = self._HANDLERS.get(event.event_type)
+        if not handler:
+            return
         
-        if notification:
-            notification['timestamp'] = event.timestamp
-            notification['event_id'] = event.id
-            self.notifications_sent.append(notification)
-            print(f"📨 Notificación enviada: {notification['title']} para usuario {notification['user_id']}")
-    
-    def get_interested_events(self) -> List[EventType]:
-        return [
-            EventType.STUDENT_JOINED_CLASS,
-            EventType.ACHIEVEMENT_UNLOCKED,
-            EventType.QUIZ_CREATED,
-            EventType.GAME_SESSION_COMPLETED
-        ]
+        notification = handler(self, event)
+        self.notifications_sent.append(notification)
+        log.debug("📨 Notificación enviada: %s para usuario %s",
+                  notification.title, notification.user_id)
+    
+    def _on_joined_class(self, event: Event) -> Notification:
+        class_name = event.data.get('class_name', 'una clase')
+        return Notification(
+            user_id=event.user_id,
+            title='¡Bienvenido a la clase!',
+            message=f'Te has unido exitosamente a {class_name}',
+            type='success',
+            timestamp=event.timestamp,
+            event_id=event.id
+        )
+    
+    def _on_achievement(self, event: Event) -> Notification:
+        achievement = event.data.get('achievement', {})
+        return Notification(
+            user_id=event.user_id,
+            title='🏆 ¡Nuevo logro!',
+            message=f'Has desbloqueado: {achievement.get("name", "Logro")}',
+            type='achievement',
+            timestamp=event.timestamp,
+            event_id=event.id
+        )
+    
+    def _on_quiz_created(self, event: Event) -> Notification:
+        return Notification(
+            user_id=event.user_id,
+            title='📝 Nuevo quiz disponible',
+            message=f'Se ha creado el quiz: {event.data.get("title", "Sin título")}',
+            type='info',
+            timestamp=event.timestamp,
+            event_id=event.id
+        )
+    
+    # Tipo de evento -> constructor de la notificación
+    _HANDLERS = {
+        EventType.STUDENT_JOINED_CLASS: _on_joined_class,
+        EventType.ACHIEVEMENT_UNLOCKED: _on_achievement,
+        EventType.QUIZ_CREATED: _on_quiz_created
+    }
     
     def get_observer_name(self) -> str:
         return "NotificationService"
+    
+    def get_recent_notifications(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Obtener las últimas notificaciones como diccionarios"""
+        start = max(0, len(self.notifications_sent) - limit)
+        return [n.to_dict() for n in islice(self.notifications_sent, start, None)]
 
 class AnalyticsTracker(Observer):
     """Observer que recolecta analytics y métricas"""
     
+    INTERESTED = frozenset(EventType)  # Interesado en todos los eventos
+    
+    # Contador total que incrementa cada tipo de evento
+    _COUNTER_KEYS = {
+        EventType.USER_REGISTERED: 'total_users',
+        EventType.GAME_SESSION_STARTED: 'total_games_played',
+        EventType.CLASS_CREATED: 'total_classes_created',
+        EventType.QUIZ_CREATED: 'total_quizzes_created'
+    }
+    
     def __init__(self):
         self.metrics = {
             'total_users': 0,
             'total_games_played': 0,
             'total_classes_created': 0,
             'total_quizzes_created': 0,
-            'daily_active_users': set(),
-            'events_by_type': {}
+            'daily_active_users': OrderedDict(),  # ordinal del día -> set de user_id
+            'events_by_type': Counter()
         }
     
     async def update(self, event: Event) -> None:
         """Recolectar métricas del evento"""
-        event_type_str = event.event_type.value
-        
-        # Contar eventos por tipo
-        if event_type_str not in self.metrics['events_by_type']:
-            self.metrics['events_by_type'][event_type_str] = 0
-        self.metrics['events_by_type'][event_type_str] += 1
-        
-        # Métricas específicas
-        if event.event_type == EventType.USER_REGISTERED:
-            self.metrics['total_users'] += 1
-        
-        elif event.event_type == EventType.GAME_SESSION_STARTED:
-            self.metrics['total_games_played'] += 1
-        
-        elif event.event_type == EventType.CLASS_CREATED:
-            self.metrics['total_classes_created'] += 1
-        
-        elif event.event_type == EventType.QUIZ_CREATED:
-            self.metrics['total_quizzes_created'] += 1
+        self._count_events(event.event_type, 1)
         
         # Usuario activo diario
         if event.user_id:
-            today = datetime.now().strftime('%Y-%m-%d')
-            self.metrics['daily_active_users'].add(f"{event.user_id}_{today}")
+            self._active_users_today().add(event.user_id)
         
-        print(f"📈 Métricas actualizadas: {event_type_str}")
-    
-    def get_interested_events(self) -> List[EventType]:
-        return list(EventType)  # Interesado en todos los eventos
+        log.debug("📈 Métricas actualizadas: %s", event.event_type_value)
+    
+    def _active_users_today(self) -> set:
+        """Set de usuarios activos de hoy, descartando días fuera de la retención"""
+        today = date.today().toordinal()
+        daily = self.metrics['daily_active_users']
+        users = daily.get(today)
+        if users is None:
+            users = daily[today] = set()
+            while len(daily) > DAU_RETENTION_DAYS:
+                daily.popitem(last=False)
+        return users
+    
+    def _count_events(self, event_type: EventType, count: int) -> None:
+        """Sumar count eventos de un tipo a los contadores"""
+        # Contar eventos por tipo
+        self.metrics['events_by_type'][event_type.value] += count
+        
+        # Métricas específicas
+        key = self._COUNTER_KEYS.get(event_type)
+        if key:
+            self.metrics[key] += count
     
     def get_observer_name(self) -> str:
         return "AnalyticsTracker"
@@ -352,16 +475,20 @@ class AnalyticsTracker(Observer):
         """Obtener resumen de métricas"""
         return {
             **self.metrics,
-            'daily_active_users_count': len(self.metrics['daily_active_users'])
+            'daily_active_users_count': sum(len(users) for users in self.metrics['daily_active_users'].values())
         }
 
 # === INICIALIZADOR DEL SISTEMA ===
 
+_observers_initialized = False
+
 def initialize_observer_system():
-    """Inicializar el sistema de observadores"""
-    print("🚀 Inicializando sistema Observer Pattern...")
+    """Inicializar el sistema de observadores (solo la primera llamada registra observers)"""
+    global _observers_initialized
+    if _observers_initialized:
+        return event_manager
     
-    event_manager = EventManager()
+    print("🚀 Inicializando sistema Observer Pattern...")
     
     # Crear y registrar observadores
     progress_tracker = ProgressTracker()
@@ -375,6 +502,7 @@ def initialize_observer_system():
     event_manager.attach(notification_service)
     event_manager.attach(analytics_tracker)
     
+    _observers_initialized = True
     print(f"✅ Sistema Observer inicializado con {event_manager.get_observers_count()} observadores")
     
     return event_manager
@@ -407,8 +535,12 @@ async def demo_observer_pattern():
         user_id='user_123'
     )
     
+    for observer in event_manager.observers:
+        if isinstance(observer, AchievementSystem):
+            await observer.wait_pending()
+    
     print(f"\n📊 Total eventos procesados: {len(event_manager.get_event_history())}")
 
 if __name__ == "__main__":
-    import asyncio
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     asyncio.run(demo_observer_pattern())
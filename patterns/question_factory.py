@@ -6,6 +6,7 @@ Implementa el patrón Factory Method para generar preguntas de quiz
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 from enum import Enum
+import random
 import uuid
 from datetime import datetime
 
@@ -38,8 +39,7 @@ class Question(ABC):
         self.time_limit = time_limit
         self.difficulty = difficulty.value
         self.explanation = explanation
-        self.created_at = datetime.now().isoformat()
-        self.updated_at = datetime.now().isoformat()
+        self.created_at = self.updated_at = datetime.now().isoformat()
     
     @abstractmethod
     def get_question_type(self) -> str:
@@ -95,24 +95,34 @@ class MultipleChoiceQuestion(Question):
         })
         return base
 
+# Respuestas aceptadas como verdadero / falso (bool, enteros ya normalizados a bool, texto en minúsculas)
+_TRUE_TOKENS = frozenset({True, "true", "verdadero", "v", "1", "yes", "sí", "si"})
+_FALSE_TOKENS = frozenset({False, "false", "falso", "f", "0", "no"})
+
 class TrueFalseQuestion(Question):
     """Pregunta verdadero/falso"""
     
     def __init__(self, question_text: str, correct_answer: bool, **kwargs):
         super().__init__(question_text, **kwargs)
         self.correct_answer = correct_answer
+        self._truth = bool(correct_answer)
         self.options = ["Verdadero", "Falso"]
     
     def get_question_type(self) -> str:
         return QuestionType.TRUE_FALSE.value
     
     def validate_answer(self, user_answer: Any) -> bool:
-        if isinstance(user_answer, bool):
-            return user_answer == self.correct_answer
-        elif isinstance(user_answer, int):
-            return bool(user_answer) == self.correct_answer
-        elif isinstance(user_answer, str):
-            return user_answer.lower() in ['true', 'verdadero'] == self.correct_answer
+        if isinstance(user_answer, str):
+            key = user_answer.strip().lower()
+        elif isinstance(user_answer, int):  # incluye bool
+            key = bool(user_answer)
+        else:
+            return False
+        
+        if key in _TRUE_TOKENS:
+            return self._truth
+        if key in _FALSE_TOKENS:
+            return not self._truth
         return False
     
     def to_dict(self) -> Dict[str, Any]:
@@ -130,6 +140,10 @@ class FillInBlankQuestion(Question):
         super().__init__(question_text, **kwargs)
         self.correct_answers = [answer.strip() for answer in correct_answers]
         self.case_sensitive = case_sensitive
+        # Conjunto ya normalizado: validar es una búsqueda O(1) sin recalcular minúsculas
+        self._correct_set = frozenset(
+            self.correct_answers if case_sensitive else (answer.lower() for answer in self.correct_answers)
+        )
         self.options = []  # No hay opciones predefinidas
     
     def get_question_type(self) -> str:
@@ -142,11 +156,8 @@ class FillInBlankQuestion(Question):
         user_answer = user_answer.strip()
         if not self.case_sensitive:
             user_answer = user_answer.lower()
-            correct_answers = [ans.lower() for ans in self.correct_answers]
-        else:
-            correct_answers = self.correct_answers
         
-        return user_answer in correct_answers
+        return user_answer in self._correct_set
     
     def to_dict(self) -> Dict[str, Any]:
         base = self.get_base_dict()
@@ -172,15 +183,8 @@ class MatchingQuestion(Question):
         return QuestionType.MATCHING.value
     
     def validate_answer(self, user_answer: Any) -> bool:
-        if not isinstance(user_answer, dict):
-            return False
-        
-        # Verificar que todos los pares coincidan
-        for left, right in self.pairs.items():
-            if user_answer.get(left) != right:
-                return False
-        
-        return len(user_answer) == len(self.pairs)
+        # Igualdad de dicts: mismas claves y todos los pares coinciden (comparación en C)
+        return isinstance(user_answer, dict) and user_answer == self.pairs
     
     def to_dict(self) -> Dict[str, Any]:
         base = self.get_base_dict()
@@ -193,6 +197,22 @@ class MatchingQuestion(Question):
         })
         return base
 
+# Tabla de despacho: tipo -> (clase, campos requeridos en orden, nombre para mensajes de error)
+_FACTORIES = {
+    QuestionType.MULTIPLE_CHOICE.value: (
+        MultipleChoiceQuestion, ('question_text', 'options', 'correct_answer'), "de opción múltiple"
+    ),
+    QuestionType.TRUE_FALSE.value: (
+        TrueFalseQuestion, ('question_text', 'correct_answer'), "verdadero/falso"
+    ),
+    QuestionType.FILL_IN_BLANK.value: (
+        FillInBlankQuestion, ('question_text', 'correct_answers'), "de llenar espacios"
+    ),
+    QuestionType.MATCHING.value: (
+        MatchingQuestion, ('question_text', 'pairs'), "de emparejar"
+    ),
+}
+
 class QuestionFactory:
     """Factory para crear diferentes tipos de preguntas"""
     
@@ -208,58 +228,16 @@ class QuestionFactory:
         Returns:
             Question: Instancia de la pregunta creada
         """
-        question_type = question_type.lower()
-        
-        if question_type == QuestionType.MULTIPLE_CHOICE.value:
-            return QuestionFactory._create_multiple_choice(**kwargs)
-        elif question_type == QuestionType.TRUE_FALSE.value:
-            return QuestionFactory._create_true_false(**kwargs)
-        elif question_type == QuestionType.FILL_IN_BLANK.value:
-            return QuestionFactory._create_fill_in_blank(**kwargs)
-        elif question_type == QuestionType.MATCHING.value:
-            return QuestionFactory._create_matching(**kwargs)
-        else:
-            raise ValueError(f"Tipo de pregunta '{question_type}' no soportado")
-    
-    @staticmethod
-    def _create_multiple_choice(**kwargs) -> MultipleChoiceQuestion:
-        """Crear pregunta de opción múltiple"""
-        required_fields = ['question_text', 'options', 'correct_answer']
-        for field in required_fields:
-            if field not in kwargs:
-                raise ValueError(f"Campo requerido '{field}' faltante para pregunta de opción múltiple")
-        
-        return MultipleChoiceQuestion(**kwargs)
-    
-    @staticmethod
-    def _create_true_false(**kwargs) -> TrueFalseQuestion:
-        """Crear pregunta verdadero/falso"""
-        required_fields = ['question_text', 'correct_answer']
-        for field in required_fields:
-            if field not in kwargs:
-                raise ValueError(f"Campo requerido '{field}' faltante para pregunta verdadero/falso")
+        factory = _FACTORIES.get(question_type.lower())
+        if factory is None:
+            raise ValueError(f"Tipo de pregunta '{question_type.lower()}' no soportado")
         
-        return TrueFalseQuestion(**kwargs)
-    
-    @staticmethod
-    def _create_fill_in_blank(**kwargs) -> FillInBlankQuestion:
-        """Crear pregunta de llenar espacios"""
-        required_fields = ['question_text', 'correct_answers']
+        question_class, required_fields, label = factory
         for field in required_fields:
             if field not in kwargs:
-                raise ValueError(f"Campo requerido '{field}' faltante para pregunta de llenar espacios")
+                raise ValueError(f"Campo requerido '{field}' faltante para pregunta {label}")
         
-        return FillInBlankQuestion(**kwargs)
-    
-    @staticmethod
-    def _create_matching(**kwargs) -> MatchingQuestion:
-        """Crear pregunta de emparejar"""
-        required_fields = ['question_text', 'pairs']
-        for field in required_fields:
-            if field not in kwargs:
-                raise ValueError(f"Campo requerido '{field}' faltante para pregunta de emparejar")
-        
-        return MatchingQuestion(**kwargs)
+        return question_class(**kwargs)
     
     @staticmethod
     def get_supported_types() -> List[str]:
@@ -283,6 +261,17 @@ class QuestionFactory:
         
         return QuestionFactory.create_question(question_type, **question_data)
 
+# Desplazamientos posibles de las opciones incorrectas respecto a la correcta
+_DISTRACTOR_OFFSETS = (-2, -1, 1, 2)
+
+# Puntos de las preguntas de matemáticas según dificultad
+_MATH_POINTS = {
+    DifficultyLevel.EASY: 10,
+    DifficultyLevel.MEDIUM: 15,
+    DifficultyLevel.HARD: 20,
+    DifficultyLevel.EXPERT: 20
+}
+
 # Ejemplo de uso y factory preconfigurado para matemáticas
 class MathQuestionFactory(QuestionFactory):
     """Factory especializado para preguntas de matemáticas"""
@@ -306,25 +295,23 @@ class MathQuestionFactory(QuestionFactory):
         
         question_text = f"¿Cuánto es {num1} {operation} {num2}?"
         
-        # Generar opciones incorrectas
-        options = [str(correct_answer)]
-        for i in range(3):
-            wrong_answer = correct_answer + (-1)**i * (i + 1) * (1 if operation in ['+', '-'] else 2)
-            if str(wrong_answer) not in options:
-                options.append(str(wrong_answer))
+        # Generar 3 opciones incorrectas distintas (offsets únicos => sin duplicados)
+        step = 1 if operation in ('+', '-') else 2
+        options = []
+        for offset in random.sample(_DISTRACTOR_OFFSETS, 3):
+            wrong_answer = correct_answer + offset * step
+            options.append(str(round(wrong_answer, 2) if operation == '/' else wrong_answer))
         
-        # Mezclar opciones pero recordar la posición correcta
-        import random
-        correct_index = 0
-        random.shuffle(options)
-        correct_index = options.index(str(correct_answer))
+        # Ubicar la correcta en una posición aleatoria
+        correct_index = random.randrange(len(options) + 1)
+        options.insert(correct_index, str(correct_answer))
         
         return MultipleChoiceQuestion(
             question_text=question_text,
             options=options,
             correct_answer=correct_index,
             difficulty=difficulty,
-            points=10 if difficulty == DifficultyLevel.EASY else 15 if difficulty == DifficultyLevel.MEDIUM else 20,
+            points=_MATH_POINTS[difficulty],
             explanation=f"La {op_name} de {num1} y {num2} es {correct_answer}"
         )
 
@@ -5,17 +5,24 @@ Sin SQLAlchemy - Solo Supabase client nativo
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import Optional, Tuple
+import asyncio
+import hashlib
 import jwt
+import time
 from datetime import datetime, timedelta, timezone
 
 from services.supabase_service import supabase_service
 from core.config import settings
+from core.auth_cache import cache_get, cache_set, token_cache, user_cache
 
 router = APIRouter()
 security = HTTPBearer()
 
+# Roles permitidos al registrarse
+REGISTER_ROLES = frozenset({"teacher", "student"})
+
 # Pydantic models
 class UserRegister(BaseModel):
     email: EmailStr
@@ -23,10 +30,14 @@ class UserRegister(BaseModel):
     name: str
     role: str = "student"  # "teacher" or "student"
 
+    model_config = ConfigDict(frozen=True)
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+    model_config = ConfigDict(frozen=True)
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
@@ -34,33 +45,68 @@ class TokenResponse(BaseModel):
     expires_in: int
     user: dict
 
+    model_config = ConfigDict(frozen=True)
+
 class RefreshToken(BaseModel):
     refresh_token: str
 
+# Clave y algoritmos JWT preparados una sola vez (con RS*/ES* evita parsear el PEM por token)
+_JWT_ALGORITHM = jwt.get_algorithm_by_name(settings.ALGORITHM)
+_SIGNING_KEY = _JWT_ALGORITHM.prepare_key(settings.SECRET_KEY)
+_VERIFY_KEY = _SIGNING_KEY.public_key() if hasattr(_SIGNING_KEY, "public_key") else _SIGNING_KEY
+_JWT_ALGORITHMS = [settings.ALGORITHM]
+_JWT_ALGORITHM_IS_HMAC = settings.ALGORITHM.startswith("HS")
+_JWT_DECODE_OPTIONS = {"verify_aud": False}  # Los tokens propios no llevan audiencia
+
 # Helper functions
-def create_access_token(data: dict) -> str:
+def create_access_token(data: dict, now: Optional[datetime] = None) -> str:
     """Crear JWT access token"""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = (now or datetime.now(timezone.utc)) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "type": "access"})
     
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, _SIGNING_KEY, algorithm=settings.ALGORITHM)
 
-def create_refresh_token(data: dict) -> str:
+def create_refresh_token(data: dict, now: Optional[datetime] = None) -> str:
     """Crear JWT refresh token"""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = (now or datetime.now(timezone.utc)) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
     
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, _SIGNING_KEY, algorithm=settings.ALGORITHM)
+
+async def _issue_tokens(data: dict) -> Tuple[str, str]:
+    """Crear access + refresh token con un único timestamp"""
+    now = datetime.now(timezone.utc)
+    
+    # HMAC firma en microsegundos: mandar a hilos costaría más que firmar aquí
+    if _JWT_ALGORITHM_IS_HMAC:
+        return create_access_token(data, now), create_refresh_token(data, now)
+    
+    # RSA/EC: firmar ambos en paralelo fuera del event loop
+    return tuple(await asyncio.gather(
+        asyncio.to_thread(create_access_token, data, now),
+        asyncio.to_thread(create_refresh_token, data, now)
+    ))
 
 def verify_token(token: str) -> Optional[dict]:
-    """Verificar JWT token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    """Verificar JWT token (los tokens válidos se cachean unos segundos, nunca más allá de su exp)"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    payload = cache_get(token_cache, key)
+    if payload is not None:
         return payload
+    
+    try:
+        payload = jwt.decode(token, _VERIFY_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
     except jwt.PyJWTError:
         return None
+    
+    ttl = settings.AUTH_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    cache_set(token_cache, key, payload, ttl)
+    return payload
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Obtener usuario actual desde token"""
@@ -88,12 +134,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Token no contiene ID de usuario válido"
         )
     
-    user = await supabase_service.get_user_by_id(user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Usuario con ID {user_id} no encontrado en base de datos"
-        )
+    user = cache_get(user_cache, user_id)
+    if user is None:
+        user = await supabase_service.get_user_by_id(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Usuario con ID {user_id} no encontrado en base de datos"
+            )
+        cache_set(user_cache, user_id, user, settings.AUTH_CACHE_TTL)
     
     if not user.get("is_active", True):
         raise HTTPException(
@@ -105,10 +154,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
 def require_role(required_role: str):
     """Dependency para requerir rol específico"""
+    required_role_upper = required_role.upper()  # Se calcula una vez al declarar la dependencia
+    
     async def role_checker(current_user: dict = Depends(get_current_user)):
-        user_role = current_user.get("role", "").upper()
+        user_role = (current_user.get("role") or "").upper()
         
-        if user_role != required_role.upper():
+        if user_role != required_role_upper:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Acceso denegado: Se requiere rol '{required_role}', usuario tiene rol '{user_role}'"
@@ -118,9 +169,10 @@ def require_role(required_role: str):
 
 def require_any_role(allowed_roles: list):
     """Dependency para requerir cualquiera de varios roles"""
+    allowed_roles_upper = frozenset(role.upper() for role in allowed_roles)
+    
     async def multi_role_checker(current_user: dict = Depends(get_current_user)):
-        user_role = current_user.get("role", "").upper()
-        allowed_roles_upper = [role.upper() for role in allowed_roles]
+        user_role = (current_user.get("role") or "").upper()
         
         if user_role not in allowed_roles_upper:
             raise HTTPException(
@@ -136,15 +188,14 @@ async def register(user_data: UserRegister):
     """Registrar nuevo usuario"""
     try:
         # Verificar si el usuario ya existe
-        existing_user = await supabase_service.get_user_by_email(user_data.email)
-        if existing_user:
+        if await supabase_service.email_exists(user_data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
         # Validar rol
-        if user_data.role not in ["teacher", "student"]:
+        if user_data.role not in REGISTER_ROLES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Role must be 'teacher' or 'student'"
@@ -165,8 +216,7 @@ async def register(user_data: UserRegister):
             "role": user["role"]
         }
         
-        access_token = create_access_token(token_data)
-        refresh_token = create_refresh_token(token_data)
+        access_token, refresh_token = await _issue_tokens(token_data)
         
         return TokenResponse(
             access_token=access_token,
@@ -206,8 +256,7 @@ async def login(user_data: UserLogin):
             "role": auth_result["role"]
         }
         
-        access_token = create_access_token(token_data)
-        refresh_token = create_refresh_token(token_data)
+        access_token, refresh_token = await _issue_tokens(token_data)
         
         user_info = {
             "id": auth_result["id"],
@@ -260,8 +309,7 @@ async def refresh_access_token(token_data: RefreshToken):
             "role": user["role"]
         }
         
-        access_token = create_access_token(new_token_data)
-        new_refresh_token = create_refresh_token(new_token_data)
+        access_token, new_refresh_token = await _issue_tokens(new_token_data)
         
         return TokenResponse(
             access_token=access_token,
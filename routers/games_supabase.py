@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
+from collections import Counter
 
 from services.supabase_service import supabase_service
 from routers.auth_supabase import get_current_user
@@ -63,15 +64,19 @@ async def get_available_games(current_user: dict = Depends(get_current_user)):
 
         quizzes = await supabase_service.get_class_quizzes(current_user["class_id"]) or []
 
+        # Contar preguntas de todos los quizzes con una sola consulta
+        questions_count = Counter()
+        if quizzes:
+            qs = supabase_service.select_all(supabase_service.client.table("questions").select("quiz_id").in_(
+                "quiz_id", [qz["id"] for qz in quizzes]
+            ).order("id"))
+            questions_count = Counter(q["quiz_id"] for q in qs)
+
         items: List[GameInfo] = []
         for qz in quizzes:
-            # Contar preguntas de cada quiz
-            qs = supabase_service.client.table("questions").select("id").eq("quiz_id", qz["id"]).execute()
-            count_q = len(qs.data or [])
-            max_score = 0
-            if qs.data:
-                # Si querés sumar puntos reales, pedí points también; para simplicidad 10 por pregunta
-                max_score = count_q * 10
+            count_q = questions_count[qz["id"]]
+            # Si querés sumar puntos reales, pedí points también; para simplicidad 10 por pregunta
+            max_score = count_q * 10
 
             items.append(GameInfo(
                 id=qz["id"],
@@ -270,6 +275,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
+from collections import Counter
 
 from services.supabase_service import supabase_service
 from routers.auth_supabase import get_current_user
@@ -326,15 +332,19 @@ async def get_available_games(current_user: dict = Depends(get_current_user)):
 
         quizzes = await supabase_service.get_class_quizzes(current_user["class_id"]) or []
 
+        # Contar preguntas de todos los quizzes con una sola consulta
+        questions_count = Counter()
+        if quizzes:
+            qs = supabase_service.select_all(supabase_service.client.table("questions").select("quiz_id").in_(
+                "quiz_id", [qz["id"] for qz in quizzes]
+            ).order("id"))
+            questions_count = Counter(q["quiz_id"] for q in qs)
+
         items: List[GameInfo] = []
         for qz in quizzes:
-            # Contar preguntas de cada quiz
-            qs = supabase_service.client.table("questions").select("id").eq("quiz_id", qz["id"]).execute()
-            count_q = len(qs.data or [])
-            max_score = 0
-            if qs.data:
-                # Si querés sumar puntos reales, pedí points también; para simplicidad 10 por pregunta
-                max_score = count_q * 10
+            count_q = questions_count[qz["id"]]
+            # Si querés sumar puntos reales, pedí points también; para simplicidad 10 por pregunta
+            max_score = count_q * 10
 
             items.append(GameInfo(
                 id=qz["id"],
@@ -6,9 +6,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import List, Optional
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
+from collections import defaultdict
 
+from core.ids import uuid7
 from services.supabase_service import supabase_service
 from routers.auth_supabase import get_current_user
 
@@ -29,6 +31,10 @@ async def create_sample_data(current_user: dict = Depends(get_current_user)):
                 detail="Only teachers can initialize sample data"
             )
         
+        # Un único timestamp para todo el lote de datos de muestra
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        
         created_data = {
             "quizzes": 0,
             "questions": 0,
@@ -142,15 +148,16 @@ async def create_sample_data(current_user: dict = Depends(get_current_user)):
             }
         ]
         
-        created_quizzes = []
+        quiz_rows = []
+        question_rows = []
         
-        # 4. Crear quizzes para cada clase
+        # 4. Crear quizzes para cada clase (se arman las filas y se insertan en bloque)
         for class_obj in classes:
             for quiz_data in sample_quizzes_data:
                 
-                # Crear quiz
-                quiz_id = str(uuid.uuid4())
-                quiz_insert = {
+                # El id se genera aquí para que las preguntas lo referencien sin ir a la base
+                quiz_id = uuid7()
+                quiz_rows.append({
                     "id": quiz_id,
                     "title": f"{quiz_data['title']} - {class_obj['name']}",
                     "description": quiz_data["description"],
@@ -161,48 +168,55 @@ async def create_sample_data(current_user: dict = Depends(get_current_user)):
                     "is_active": True,
                     "is_published": True,
                     "time_limit": 300,  # 5 minutos
-                    "created_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat(),
-                    "published_at": datetime.utcnow().isoformat()
-                }
-                
-                quiz_result = supabase_service.client.table("quizzes").insert(quiz_insert).execute()
+                    "created_at": now_iso,
+                    "updated_at": now_iso,
+                    "published_at": now_iso
+                })
                 
-                if quiz_result.data:
-                    created_data["quizzes"] += 1
-                    created_quizzes.append(quiz_result.data[0])
-                    
-                    # Crear preguntas para este quiz
-                    for i, question_data in enumerate(quiz_data["questions"]):
-                        question_id = str(uuid.uuid4())
-                        question_insert = {
-                            "id": question_id,
-                            "quiz_id": quiz_id,
-                            "question_text": question_data["question_text"],
-                            "question_type": "MULTIPLE_CHOICE",
-                            "options": question_data["options"],
-                            "correct_answer": question_data["correct_answer"],
-                            "explanation": question_data["explanation"],
-                            "difficulty": quiz_data["difficulty"].upper(),  # Convertir a mayúsculas
-                            "points": question_data["points"],
-                            "time_limit": 30,
-                            "order_index": i,
-                            "created_at": datetime.utcnow().isoformat()
-                        }
-                        
-                        question_result = supabase_service.client.table("questions").insert(question_insert).execute()
-                        
-                        if question_result.data:
-                            created_data["questions"] += 1
+                # Preguntas para este quiz
+                for i, question_data in enumerate(quiz_data["questions"]):
+                    question_rows.append({
+                        "id": uuid7(),
+                        "quiz_id": quiz_id,
+                        "question_text": question_data["question_text"],
+                        "question_type": "MULTIPLE_CHOICE",
+                        "options": question_data["options"],
+                        "correct_answer": question_data["correct_answer"],
+                        "explanation": question_data["explanation"],
+                        "difficulty": quiz_data["difficulty"].upper(),  # Convertir a mayúsculas
+                        "points": question_data["points"],
+                        "time_limit": 30,
+                        "order_index": i,
+                        "created_at": now_iso
+                    })
+        
+        # Los ids ya se conocen, así que las inserciones en lote no devuelven las filas
+        created_data["quizzes"] = await supabase_service.bulk_insert("quizzes", quiz_rows)
+        created_data["questions"] = await supabase_service.bulk_insert("questions", question_rows)
+        created_quizzes = quiz_rows
         
         # 5. Crear sesiones de juego simuladas para estudiantes
         if students and created_quizzes:
+            sample_quizzes = created_quizzes[:3]  # Primeros 3 quizzes
+            
+            # Las preguntas recién insertadas ya están en memoria, agrupadas por quiz
+            sample_quiz_ids = {quiz["id"] for quiz in sample_quizzes}
+            questions_by_quiz = {}
+            for question in question_rows:
+                if question["quiz_id"] in sample_quiz_ids:
+                    questions_by_quiz.setdefault(question["quiz_id"], []).append(question)
+            
+            session_rows = []
+            answer_rows = []
+            
+            # Desfase de cada respuesta respecto al inicio de la sesión (30s por pregunta)
+            max_questions = max((len(q) for q in questions_by_quiz.values()), default=0)
+            answer_offsets = [timedelta(seconds=30*j) for j in range(max_questions)]
+            
             for student in students[:5]:  # Primeros 5 estudiantes
-                for quiz in created_quizzes[:3]:  # Primeros 3 quizzes
+                for quiz in sample_quizzes:
                     
-                    # Obtener preguntas del quiz
-                    questions_result = supabase_service.client.table("questions").select("*").eq("quiz_id", quiz["id"]).execute()
-                    questions = questions_result.data
+                    questions = questions_by_quiz.get(quiz["id"], [])
                     
                     if questions:
                         session_id = str(uuid.uuid4())
@@ -213,10 +227,10 @@ async def create_sample_data(current_user: dict = Depends(get_current_user)):
                         score = (correct_answers / total_questions) * 100
                         
                         # Tiempo de inicio aleatorio en los últimos 7 días
-                        start_time = datetime.utcnow() - timedelta(days=random.randint(0, 7), hours=random.randint(0, 23))
+                        start_time = now - timedelta(days=random.randint(0, 7), hours=random.randint(0, 23))
                         end_time = start_time + timedelta(minutes=random.randint(3, 10))
                         
-                        session_insert = {
+                        session_rows.append({
                             "id": session_id,
                             "student_id": student["id"],
                             "quiz_id": quiz["id"],
@@ -230,79 +244,85 @@ async def create_sample_data(current_user: dict = Depends(get_current_user)):
                             "end_time": end_time.isoformat(),
                             "total_time_seconds": int((end_time - start_time).total_seconds()),
                             "hints_used": random.randint(0, 2),
-                            "created_at": datetime.utcnow().isoformat()
-                        }
-                        
-                        session_result = supabase_service.client.table("game_sessions").insert(session_insert).execute()
+                            "created_at": now_iso
+                        })
                         
-                        if session_result.data:
-                            created_data["sessions"] += 1
+                        # Respuestas para esta sesión
+                        for j, question in enumerate(questions):
+                            is_correct = j < correct_answers
+                            selected_answer = question["correct_answer"] if is_correct else random.choice([i for i in range(len(question["options"])) if i != question["correct_answer"]])
                             
-                            # Crear respuestas para esta sesión
-                            for j, question in enumerate(questions):
-                                answer_id = str(uuid.uuid4())
-                                is_correct = j < correct_answers
-                                selected_answer = question["correct_answer"] if is_correct else random.choice([i for i in range(len(question["options"])) if i != question["correct_answer"]])
-                                
-                                answer_insert = {
-                                    "id": answer_id,
-                                    "session_id": session_id,
-                                    "question_id": question["id"],
-                                    "selected_answer": selected_answer,
-                                    "is_correct": is_correct,
-                                    "time_taken_seconds": random.randint(10, 30),
-                                    "attempts": 1,
-                                    "hint_used": random.choice([True, False]) if random.random() < 0.3 else False,
-                                    "confidence_level": random.randint(60, 100),
-                                    "answered_at": (start_time + timedelta(seconds=30*j)).isoformat()
-                                }
-                                
-                                answer_result = supabase_service.client.table("answers").insert(answer_insert).execute()
-                                
-                                if answer_result.data:
-                                    created_data["answers"] += 1
+                            answer_rows.append({
+                                "id": str(uuid.uuid4()),
+                                "session_id": session_id,
+                                "question_id": question["id"],
+                                "selected_answer": selected_answer,
+                                "is_correct": is_correct,
+                                "time_taken_seconds": random.randint(10, 30),
+                                "attempts": 1,
+                                "hint_used": random.choice([True, False]) if random.random() < 0.3 else False,
+                                "confidence_level": random.randint(60, 100),
+                                "answered_at": (start_time + answer_offsets[j]).isoformat()
+                            })
+            
+            created_data["sessions"] = await supabase_service.bulk_insert("game_sessions", session_rows)
+            created_data["answers"] = await supabase_service.bulk_insert("answers", answer_rows)
             
             # 6. Crear métricas de progreso para estudiantes
+            # Sesiones de todos los estudiantes en una sola consulta, agrupadas por student_id
+            # (solo las columnas que se agregan, no la fila completa; paginada para no cortar en max_rows)
+            sessions = supabase_service.select_all(supabase_service.client.table("game_sessions").select(
+                "student_id, score, total_questions, correct_answers, total_time_seconds"
+            ).in_(
+                "student_id", [student["id"] for student in students[:5]]
+            ).order("id"))
+            sessions_by_student = defaultdict(list)
+            for session in sessions:
+                sessions_by_student[session["student_id"]].append(session)
+            
+            progress_rows = []
             for student in students[:5]:
+                student_sessions = sessions_by_student[student["id"]]
+                
+                if not student_sessions:
+                    continue
+                
+                # Calcular métricas en una sola pasada (son las mismas para cada clase)
+                total_games = len(student_sessions)
+                total_questions = total_correct = total_score = total_seconds = best_score = 0
+                for s in student_sessions:
+                    score = s.get("score") or 0
+                    total_questions += s.get("total_questions") or 0
+                    total_correct += s.get("correct_answers") or 0
+                    total_seconds += s.get("total_time_seconds") or 0
+                    total_score += score
+                    if score > best_score:
+                        best_score = score
+                avg_score = total_score / total_games
+                total_time = total_seconds // 60
+                
                 for class_obj in classes:
-                    
-                    # Calcular métricas basadas en sesiones del estudiante
-                    sessions_result = supabase_service.client.table("game_sessions").select("*").eq("student_id", student["id"]).execute()
-                    student_sessions = sessions_result.data
-                    
-                    if student_sessions:
-                        total_games = len(student_sessions)
-                        total_questions = sum(s.get("total_questions", 0) for s in student_sessions)
-                        total_correct = sum(s.get("correct_answers", 0) for s in student_sessions)
-                        avg_score = sum(s.get("score", 0) for s in student_sessions) / len(student_sessions)
-                        best_score = max(s.get("score", 0) for s in student_sessions)
-                        total_time = sum(s.get("total_time_seconds", 0) for s in student_sessions) // 60
-                        
-                        progress_id = str(uuid.uuid4())
-                        progress_insert = {
-                            "id": progress_id,
-                            "student_id": student["id"],
-                            "class_id": class_obj["id"],
-                            "total_games_played": total_games,
-                            "total_questions_answered": total_questions,
-                            "total_correct_answers": total_correct,
-                            "total_time_spent_minutes": total_time,
-                            "average_score": round(avg_score, 2),
-                            "best_score": best_score,
-                            "current_streak": random.randint(0, 5),
-                            "longest_streak": random.randint(2, 8),
-                            "preferred_topics": ["Matemáticas", "Ciencias", "Historia"],
-                            "common_mistakes": ["Operaciones complejas", "Fechas históricas"],
-                            "improvement_areas": ["Velocidad de respuesta", "Comprensión lectora"],
-                            "last_activity": datetime.utcnow().isoformat(),
-                            "weekly_activity_minutes": random.randint(60, 300),
-                            "created_at": datetime.utcnow().isoformat()
-                        }
-                        
-                        progress_result = supabase_service.client.table("progress_metrics").insert(progress_insert).execute()
-                        
-                        if progress_result.data:
-                            created_data["progress"] += 1
+                    progress_rows.append({
+                        "id": str(uuid.uuid4()),
+                        "student_id": student["id"],
+                        "class_id": class_obj["id"],
+                        "total_games_played": total_games,
+                        "total_questions_answered": total_questions,
+                        "total_correct_answers": total_correct,
+                        "total_time_spent_minutes": total_time,
+                        "average_score": round(avg_score, 2),
+                        "best_score": best_score,
+                        "current_streak": random.randint(0, 5),
+                        "longest_streak": random.randint(2, 8),
+                        "preferred_topics": ["Matemáticas", "Ciencias", "Historia"],
+                        "common_mistakes": ["Operaciones complejas", "Fechas históricas"],
+                        "improvement_areas": ["Velocidad de respuesta", "Comprensión lectora"],
+                        "last_activity": now_iso,
+                        "weekly_activity_minutes": random.randint(60, 300),
+                        "created_at": now_iso
+                    })
+            
+            created_data["progress"] = await supabase_service.bulk_insert("progress_metrics", progress_rows)
         
         return InitDataResponse(
             success=True,
@@ -337,7 +357,7 @@ async def get_database_status(current_user: dict = Depends(get_current_user)):
         return {
             "success": True,
             "status": status,
-            "last_check": datetime.utcnow().isoformat()
+            "last_check": datetime.now(timezone.utc).isoformat()
         }
         
     except Exception as e:
@@ -346,6 +366,14 @@ async def get_database_status(current_user: dict = Depends(get_current_user)):
             detail=f"Error getting database status: {str(e)}"
         )
 
+def _filter_sample_rows(query, table: str, teacher_id: str):
+    """Filas de muestra a limpiar en una tabla"""
+    # Solo eliminar datos creados por el profesor actual si es aplicable
+    if table == "quizzes":
+        return query.eq("creator_id", teacher_id)
+    # Para otras tablas, eliminar todos los registros (cuidado en producción)
+    return query.neq("id", "00000000-0000-0000-0000-000000000000")
+
 @router.delete("/clear-sample-data")
 async def clear_sample_data(current_user: dict = Depends(get_current_user)):
     """Limpiar datos de muestra (solo profesores)"""
@@ -362,14 +390,16 @@ async def clear_sample_data(current_user: dict = Depends(get_current_user)):
         
         for table in tables_to_clear:
             try:
-                # Solo eliminar datos creados por el profesor actual si es aplicable
-                if table == "quizzes":
-                    result = supabase_service.client.table(table).delete().eq("creator_id", current_user["id"]).execute()
-                else:
-                    # Para otras tablas, eliminar todos los registros (cuidado en producción)
-                    result = supabase_service.client.table(table).delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+                # Conteo exacto trayendo una sola fila y DELETE sin devolver las filas borradas
+                # (postgrest-py reporta count=0 cuando el DELETE usa returning="minimal")
+                count_result = _filter_sample_rows(
+                    supabase_service.client.table(table).select("id", count="exact"), table, current_user["id"]
+                ).limit(1).execute()
+                _filter_sample_rows(
+                    supabase_service.client.table(table).delete(returning="minimal"), table, current_user["id"]
+                ).execute()
                 
-                cleared_data[table] = len(result.data or [])
+                cleared_data[table] = count_result.count or 0
             except Exception as e:
                 cleared_data[table] = f"Error: {str(e)}"
         
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
 
+from core.ids import uuid7
 from services.supabase_service import supabase_service
 from routers.auth_supabase import get_current_user
 
@@ -103,14 +104,15 @@ async def create_quiz(
             difficulty=quiz_difficulty_db
         )
 
-        # Crear las preguntas
-        questions = []
+        # Crear las preguntas (una sola inserción para todo el quiz)
+        questions_data = []
         for i, qd in enumerate(quiz_data.questions):
             # 🔁 ENUMS a MAYÚSCULAS para DB (Postgres enums)
             qt_db = (qd.question_type or "multiple_choice").upper()
             diff_db = (qd.difficulty or "MEDIUM").upper()
 
-            question = await supabase_service.create_question({
+            questions_data.append({
+                "id": uuid7(),
                 "quiz_id": new_quiz["id"],
                 "question_text": qd.question_text,
                 "question_type": qt_db,                  # 👈 enum DB
@@ -122,7 +124,9 @@ async def create_quiz(
                 "time_limit": qd.time_limit,
                 "order_index": i
             })
-            questions.append(QuestionResponse(**question))
+
+        created_questions = await supabase_service.create_questions(questions_data)
+        questions = [QuestionResponse(**question) for question in created_questions]
 
         quiz_response = QuizResponse(**new_quiz)
         quiz_response.questions = questions
@@ -151,9 +155,14 @@ async def get_class_quizzes(
         else:
             raise HTTPException(403, "Access denied")
 
+        # Preguntas de todos los quizzes en una sola consulta (solo lo necesario para el listado)
+        questions_by_quiz = await supabase_service.get_questions_by_quiz(
+            [quiz["id"] for quiz in quizzes], columns="quiz_id, points"
+        )
+
         quiz_items = []
         for quiz in quizzes:
-            questions = await supabase_service.get_quiz_questions(quiz["id"])
+            questions = questions_by_quiz[quiz["id"]]
             total_points = sum(q.get("points", 10) for q in questions)
 
             quiz_items.append(QuizListItem(
@@ -3,15 +3,38 @@ Router de usuarios usando exclusivamente Supabase
 Versión pura sin SQLAlchemy - Solo Supabase client nativo
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
 from typing import Optional
+import orjson
 
 from services.supabase_service import supabase_service
 from routers.auth_supabase import get_current_user
 
 router = APIRouter()
 
+# Catálogos fijos: se serializan una sola vez al importar el módulo
+AVAILABLE_AVATARS_JSON = orjson.dumps({
+    "avatars": [
+        {"id": "avatar1", "name": "Avatar 1", "url": "/avatars/avatar1.png"},
+        {"id": "avatar2", "name": "Avatar 2", "url": "/avatars/avatar2.png"},
+        {"id": "avatar3", "name": "Avatar 3", "url": "/avatars/avatar3.png"},
+        {"id": "avatar4", "name": "Avatar 4", "url": "/avatars/avatar4.png"},
+        {"id": "avatar5", "name": "Avatar 5", "url": "/avatars/avatar5.png"},
+    ]
+})
+
+AVAILABLE_MASCOTS_JSON = orjson.dumps({
+    "mascots": [
+        {"id": "carpi", "name": "Carpi", "url": "/mascotas/carpi.png"},
+        {"id": "dino", "name": "Dino", "url": "/mascotas/dino.png"},
+        {"id": "gato", "name": "Gato", "url": "/mascotas/gato.png"},
+        {"id": "jabali", "name": "Jabalí", "url": "/mascotas/jabali.png"},
+        {"id": "perro", "name": "Perro", "url": "/mascotas/perro.png"},
+        {"id": "pollito", "name": "Pollito", "url": "/mascotas/pollito.png"},
+    ]
+})
+
 # Pydantic models
 class UserProfile(BaseModel):
     name: str
@@ -157,29 +180,12 @@ async def setup_initial_profile(
 @router.get("/available-avatars")
 async def get_available_avatars():
     """Obtener avatares disponibles"""
-    return {
-        "avatars": [
-            {"id": "avatar1", "name": "Avatar 1", "url": "/avatars/avatar1.png"},
-            {"id": "avatar2", "name": "Avatar 2", "url": "/avatars/avatar2.png"},
-            {"id": "avatar3", "name": "Avatar 3", "url": "/avatars/avatar3.png"},
-            {"id": "avatar4", "name": "Avatar 4", "url": "/avatars/avatar4.png"},
-            {"id": "avatar5", "name": "Avatar 5", "url": "/avatars/avatar5.png"},
-        ]
-    }
+    return Response(content=AVAILABLE_AVATARS_JSON, media_type="application/json")
 
 @router.get("/available-mascots")
 async def get_available_mascots():
     """Obtener mascotas disponibles (solo estudiantes)"""
-    return {
-        "mascots": [
-            {"id": "carpi", "name": "Carpi", "url": "/mascotas/carpi.png"},
-            {"id": "dino", "name": "Dino", "url": "/mascotas/dino.png"},
-            {"id": "gato", "name": "Gato", "url": "/mascotas/gato.png"},
-            {"id": "jabali", "name": "Jabalí", "url": "/mascotas/jabali.png"},
-            {"id": "perro", "name": "Perro", "url": "/mascotas/perro.png"},
-            {"id": "pollito", "name": "Pollito", "url": "/mascotas/pollito.png"},
-        ]
-    }
+    return Response(content=AVAILABLE_MASCOTS_JSON, media_type="application/json")
 
 @router.delete("/profile")
 async def delete_user_profile(current_user: dict = Depends(get_current_user)):
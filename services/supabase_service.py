@@ -6,13 +6,51 @@ Integrado con Factory Pattern y Observer Pattern
 
 from typing import List, Dict, Any, Optional
 from core.supabase_client import get_supabase_client, get_supabase_admin_client
+from core.ids import uuid7
+from core.auth_cache import invalidate_cached_user
+from core.security import hash_password_async, verify_password_async, needs_rehash
 from supabase import Client
+from postgrest.exceptions import APIError
+import asyncio
+import base64
+import os
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
 
 # Importar patrones de diseño
 from patterns.question_factory import QuestionFactory, MathQuestionFactory, DifficultyLevel
-from patterns.observer_system import EventManager, EventType
+from patterns.observer_system import EventType, event_manager
+
+# Largo de los códigos de clase (base32: [A-Z2-7], sin 0/O ni 1/I ambiguos)
+CLASS_CODE_LENGTH = 6
+# Reintentos del lote de códigos si todos los candidatos ya existen
+CLASS_CODE_MAX_ATTEMPTS = 5
+
+# Columnas de users que necesita el login
+AUTH_USER_COLUMNS = "id, email, name, role, is_active, hashed_password"
+
+# Código de error de Postgres para violación de restricción UNIQUE
+UNIQUE_VIOLATION = "23505"
+
+# Código de PostgREST cuando la función RPC no existe en la base
+FUNCTION_NOT_FOUND = "PGRST202"
+
+# Errores de la RPC que indican una base sin la función o con un esquema anterior
+# (42703: columna inexistente, 42883: función inexistente): se usa el flujo en varias consultas
+RPC_FALLBACK_CODES = frozenset({FUNCTION_NOT_FOUND, "42703", "42883"})
+
+# Filas por página al leer resultados grandes (no mayor que max_rows de PostgREST, 1000 en Supabase)
+QUERY_PAGE_SIZE = 1000
+
+# Filas por request en inserciones masivas (evita bodies gigantes hacia PostgREST)
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Valores ENUM válidos según schema Supabase (frozenset: pertenencia O(1))
+VALID_ROLES = frozenset({'STUDENT', 'TEACHER'})
+VALID_DIFFICULTIES = frozenset({'EASY', 'MEDIUM', 'HARD'})
+VALID_QUESTION_TYPES = frozenset({'MULTIPLE_CHOICE', 'TRUE_FALSE', 'FILL_IN_BLANK', 'MATCHING'})
+VALID_SESSION_STATUS = frozenset({'IN_PROGRESS', 'COMPLETED', 'ABANDONED', 'PAUSED'})
 
 class SupabaseService:
     """Servicio para todas las operaciones de base de datos con Supabase"""
@@ -20,16 +58,47 @@ class SupabaseService:
     def __init__(self):
         self.client: Client = get_supabase_client()
         self.admin_client: Client = get_supabase_admin_client()
-        self.event_manager = EventManager()
+        self.event_manager = event_manager
         
-        # Definir valores ENUM válidos según schema Supabase
-        self.VALID_ROLES = ['STUDENT', 'TEACHER']
-        self.VALID_DIFFICULTIES = ['EASY', 'MEDIUM', 'HARD']
-        self.VALID_QUESTION_TYPES = ['MULTIPLE_CHOICE', 'TRUE_FALSE', 'FILL_IN_BLANK', 'MATCHING']
-        self.VALID_SESSION_STATUS = ['IN_PROGRESS', 'COMPLETED', 'ABANDONED', 'PAUSED']
+        # Tareas en segundo plano: el event loop solo las referencia débilmente
+        self._background_tasks = set()
+        
+        # Valores ENUM válidos según schema Supabase
+        self.VALID_ROLES = VALID_ROLES
+        self.VALID_DIFFICULTIES = VALID_DIFFICULTIES
+        self.VALID_QUESTION_TYPES = VALID_QUESTION_TYPES
+        self.VALID_SESSION_STATUS = VALID_SESSION_STATUS
         
         print("🔗 SupabaseService integrado con Observer Pattern")
     
+    def _run_in_background(self, coro) -> asyncio.Task:
+        """Lanzar una corrutina sin esperarla, conservando la referencia hasta que termine"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_task_done)
+        return task
+    
+    def _on_background_task_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Error en tarea en segundo plano: {task.exception()}")
+    
+    def select_all(self, query, page_size: int = QUERY_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """Ejecutar un select paginando con range() hasta agotarlo.
+        
+        PostgREST corta en max_rows sin avisar; la consulta debe tener un orden
+        estable que termine en id, en un único order (p. ej. .order("start_time,id"):
+        encadenar .order() envía varios parámetros y PostgREST aplica solo uno)
+        para que las páginas no se solapen.
+        """
+        rows: List[Dict[str, Any]] = []
+        while True:
+            # postgrest 0.13: range(inicio, fin) con fin exclusivo
+            page = query.range(len(rows), len(rows) + page_size).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+    
     # ================================
     # USUARIOS
     # ================================
@@ -38,17 +107,15 @@ class SupabaseService:
         """Crear usuario solo en tabla users (sin Supabase Auth por problema de RLS)"""
         try:
             # Verificar si el usuario ya existe
-            existing_user = await self.get_user_by_email(email)
-            if existing_user:
+            if await self.email_exists(email):
                 raise Exception("User already exists")
             
             # Crear usuario directamente en tabla users
             user_id = str(uuid.uuid4())
             
-            # Hash básico de password (en producción usar bcrypt)
-            import hashlib
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
+            hashed_password = await hash_password_async(password)
             
+            now = self._now_iso()
             user_data = {
                 "id": user_id,
                 "email": email,
@@ -56,16 +123,15 @@ class SupabaseService:
                 "hashed_password": hashed_password,
                 "role": self._normalize_role(role),  # Validar ENUM role
                 "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "created_at": now,
+                "updated_at": now
             }
             
             result = self.admin_client.table("users").insert(user_data).execute()
             
             if result.data:
                 # Emitir evento de usuario registrado
-                import asyncio
-                asyncio.create_task(self.event_manager.emit_event(
+                self._run_in_background(self.event_manager.emit_event(
                     EventType.USER_REGISTERED,
                     {
                         "email": email,
@@ -88,10 +154,10 @@ class SupabaseService:
         except Exception as e:
             raise Exception(f"Error creating user: {str(e)}")
     
-    async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
-        """Obtener usuario por email"""
+    async def get_user_by_email(self, email: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        """Obtener usuario por email (columns permite traer solo lo necesario)"""
         try:
-            result = self.client.table("users").select("*").eq("email", email).execute()
+            result = self.client.table("users").select(columns).eq("email", email).limit(1).execute()
             
             if result.data:
                 return result.data[0]
@@ -101,6 +167,16 @@ class SupabaseService:
             print(f"Error getting user by email: {e}")
             return None
     
+    async def email_exists(self, email: str) -> bool:
+        """Verificar si ya hay un usuario con ese email (solo trae el id)"""
+        try:
+            result = self.client.table("users").select("id").eq("email", email).limit(1).execute()
+            return bool(result.data)
+            
+        except Exception as e:
+            print(f"Error checking user email: {e}")
+            return False
+    
     async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Obtener usuario por ID"""
         try:
@@ -117,9 +193,10 @@ class SupabaseService:
     async def update_user(self, user_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """Actualizar datos del usuario"""
         try:
-            update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+            update_data["updated_at"] = self._now_iso()
             
             result = self.client.table("users").update(update_data).eq("id", user_id).execute()
+            invalidate_cached_user(user_id)
             
             if result.data:
                 return result.data[0]
@@ -136,17 +213,20 @@ class SupabaseService:
     async def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
         """Autenticar usuario con tabla users (sin Supabase Auth)"""
         try:
-            # Buscar usuario por email
-            user_data = await self.get_user_by_email(email)
+            # Buscar usuario por email (solo las columnas que usa el login; email es UNIQUE e indexado)
+            user_data = await self.get_user_by_email(email, columns=AUTH_USER_COLUMNS)
             
             if not user_data:
                 return None
             
             # Verificar contraseña hasheada
-            import hashlib
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
+            stored_hash = user_data.get("hashed_password") or ""
             
-            if user_data.get("hashed_password") == hashed_password:
+            if await verify_password_async(password, stored_hash):
+                # Migrar hashes sha256 antiguos a bcrypt en segundo plano (el login no espera la escritura)
+                if needs_rehash(stored_hash):
+                    self._run_in_background(self._upgrade_password_hash(user_data["id"], password))
+                
                 return {
                     "id": user_data["id"],
                     "email": user_data["email"],
@@ -162,6 +242,17 @@ class SupabaseService:
             print(f"Error authenticating user: {e}")
             return None
     
+    async def _upgrade_password_hash(self, user_id: str, password: str) -> None:
+        """Reemplazar un hash sha256 antiguo por bcrypt"""
+        try:
+            hashed_password = await hash_password_async(password)
+            self.admin_client.table("users").update(
+                {"hashed_password": hashed_password}, returning="minimal"
+            ).eq("id", user_id).execute()
+            invalidate_cached_user(user_id)
+        except Exception as e:
+            print(f"Error rehashing password: {e}")
+    
     # ================================
     # CLASES
     # ================================
@@ -169,24 +260,33 @@ class SupabaseService:
     async def create_class(self, name: str, description: str, teacher_id: str, max_students: int = 30) -> Dict[str, Any]:
         """Crear nueva clase - Alineado con schema Supabase"""
         try:
+            now = self._now_iso()
             class_data = {
-                "id": str(uuid.uuid4()),
+                "id": uuid7(),
                 "name": name,
                 "description": description,
                 "teacher_id": teacher_id,
-                "class_code": self._generate_class_code(),
+                "class_code": (await self._generate_unique_class_codes(1))[0],
                 "is_active": True,
                 "max_students": max_students,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "created_at": now,
+                "updated_at": now
             }
             
-            result = self.client.table("classes").insert(class_data).execute()
+            # El probe previo evita casi todas las colisiones; si otra clase tomó el código
+            # entre el probe y el insert, la restricción UNIQUE lo rechaza y se reintenta
+            for attempt in range(CLASS_CODE_MAX_ATTEMPTS):
+                try:
+                    result = self.client.table("classes").insert(class_data).execute()
+                    break
+                except APIError as e:
+                    if e.code != UNIQUE_VIOLATION or attempt == CLASS_CODE_MAX_ATTEMPTS - 1:
+                        raise
+                    class_data["class_code"] = (await self._generate_unique_class_codes(1))[0]
             
             if result.data:
                 # Emitir evento de clase creada
-                import asyncio
-                asyncio.create_task(self.event_manager.emit_event(
+                self._run_in_background(self.event_manager.emit_event(
                     EventType.CLASS_CREATED,
                     {
                         "class_id": class_data["id"],
@@ -214,16 +314,39 @@ class SupabaseService:
             print(f"Error getting teacher classes: {e}")
             return []
     
+    def _now_iso(self) -> str:
+        """Timestamp UTC en ISO 8601 (se calcula una vez por escritura)"""
+        return datetime.now(timezone.utc).isoformat()
+    
     def _generate_class_code(self) -> str:
-        """Generar código único para clase"""
-        import random
-        import string
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        """Generar código de clase: 5 bytes aleatorios del SO en base32 (una sola llamada, sin bucle)"""
+        return base64.b32encode(os.urandom(5))[:CLASS_CODE_LENGTH].decode("ascii")
+    
+    async def _generate_unique_class_codes(self, n: int) -> List[str]:
+        """Generar n códigos de clase libres: lote de candidatos + una sola consulta de unicidad"""
+        codes: List[str] = []
+        for _ in range(CLASS_CODE_MAX_ATTEMPTS):
+            missing = n - len(codes)
+            # ~10% de candidatos extra para cubrir colisiones sin reintentar
+            candidates = {self._generate_class_code() for _ in range(missing + missing // 10 + 1)}
+            candidates.difference_update(codes)
+            
+            result = (self.client.table("classes")
+                     .select("class_code")
+                     .in_("class_code", list(candidates))
+                     .execute())
+            taken = {row["class_code"] for row in result.data or []}
+            
+            codes.extend(list(candidates - taken)[:missing])
+            if len(codes) == n:
+                return codes
+        
+        raise Exception("No se pudieron generar códigos de clase únicos")
     
-    def _validate_enum_value(self, value: str, valid_values: list, field_name: str) -> str:
-        """Validar que un valor esté en la lista de valores válidos para ENUMs"""
+    def _validate_enum_value(self, value: str, valid_values: frozenset, field_name: str) -> str:
+        """Validar que un valor esté en el conjunto de valores válidos para ENUMs"""
         if value not in valid_values:
-            raise ValueError(f"Valor '{value}' inválido para {field_name}. Valores válidos: {valid_values}")
+            raise ValueError(f"Valor '{value}' inválido para {field_name}. Valores válidos: {sorted(valid_values)}")
         return value
     
     def _normalize_role(self, role: str) -> str:
@@ -255,8 +378,9 @@ class SupabaseService:
                          time_limit: int = None, topic: str = None) -> Dict[str, Any]:
         """Crear un nuevo quiz - Alineado con schema Supabase"""
         try:
+            now = self._now_iso()
             quiz_data = {
-                "id": str(uuid.uuid4()),
+                "id": uuid7(),
                 "title": title,
                 "description": description,
                 "creator_id": created_by,
@@ -266,8 +390,8 @@ class SupabaseService:
                 "is_published": False,  # Por defecto no publicado hasta completar
                 "topic": topic,
                 "time_limit": time_limit,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "created_at": now,
+                "updated_at": now
             }
             
             result = self.client.table("quizzes").insert(quiz_data).execute()
@@ -275,10 +399,11 @@ class SupabaseService:
             if result.data:
                 quiz_id = result.data[0]["id"]
                 
-                # Crear preguntas por separado
+                # Crear todas las preguntas en una sola inserción
+                questions_data = []
                 for i, question in enumerate(questions):
-                    question_data = {
-                        "id": str(uuid.uuid4()),
+                    questions_data.append({
+                        "id": uuid7(),
                         "quiz_id": quiz_id,
                         "question_text": question.get("question_text", ""),
                         "question_type": self._normalize_question_type(question.get("question_type", "multiple_choice")),
@@ -289,11 +414,12 @@ class SupabaseService:
                         "points": question.get("points", 10),
                         "time_limit": question.get("time_limit", 30),
                         "order_index": i,
-                        "created_at": datetime.now(timezone.utc).isoformat(),
-                        "updated_at": datetime.now(timezone.utc).isoformat()
-                    }
-                    
-                    await self.create_question(question_data)
+                        "created_at": now,
+                        "updated_at": now
+                    })
+                
+                if questions_data:
+                    await self.create_questions(questions_data)
                 
                 return result.data[0]
             else:
@@ -344,6 +470,7 @@ class SupabaseService:
             quiz = await self.get_quiz_by_id(session_data["quiz_id"])
             total_questions = len(quiz.get("questions", [])) if quiz else 0
             
+            now = self._now_iso()
             game_session = {
                 "id": str(uuid.uuid4()),
                 "quiz_id": session_data["quiz_id"],
@@ -352,12 +479,12 @@ class SupabaseService:
                 "current_question": session_data.get("current_question", 0),
                 "score": session_data.get("score", 0),
                 "total_questions": total_questions,
-                "start_time": session_data.get("start_time", datetime.now().isoformat()),
+                "start_time": session_data.get("start_time", now),
                 "correct_answers": 0,
                 "incorrect_answers": 0,
                 "hints_used": 0,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "created_at": now,
+                "updated_at": now
             }
             
             result = self.client.table("game_sessions").insert(game_session).execute()
@@ -410,7 +537,7 @@ class SupabaseService:
                 "id": str(uuid.uuid4()),
                 "class_id": class_id,
                 "student_id": student_id,
-                "enrolled_at": datetime.now(timezone.utc).isoformat()
+                "enrolled_at": self._now_iso()
             }
             
             result = self.client.table("class_enrollments").insert(enrollment_data).execute()
@@ -458,6 +585,23 @@ class SupabaseService:
         except Exception as e:
             raise Exception(f"Error creating question with factory: {str(e)}")
     
+    async def create_questions(self, questions_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Crear varias preguntas en una sola inserción (un único request a PostgREST)"""
+        try:
+            if not questions_data:
+                return []
+            
+            result = self.client.table("questions").insert(questions_data).execute()
+            
+            if result.data:
+                print(f"✅ {len(result.data)} preguntas creadas")
+                return result.data
+            else:
+                raise Exception("Failed to create questions")
+                
+        except Exception as e:
+            raise Exception(f"Error creating questions: {str(e)}")
+    
     async def create_math_question(self, quiz_id: str, operation: str, num1: int, num2: int, 
                                  difficulty: str = "medium", order_index: int = 0) -> Dict[str, Any]:
         """Crear pregunta de matemáticas automáticamente usando MathQuestionFactory"""
@@ -508,6 +652,29 @@ class SupabaseService:
             print(f"Error getting quiz questions: {e}")
             return []
 
+    async def get_questions_by_quiz(self, quiz_ids: List[str], columns: str = "*") -> Dict[str, List[Dict[str, Any]]]:
+        """Obtener preguntas de varios quizzes en una sola consulta, agrupadas por quiz_id"""
+        questions_by_quiz: Dict[str, List[Dict[str, Any]]] = {quiz_id: [] for quiz_id in quiz_ids}
+        if not quiz_ids:
+            return questions_by_quiz
+        
+        try:
+            if columns != "*" and "quiz_id" not in columns:
+                columns = f"quiz_id, {columns}"
+            
+            questions = self.select_all(self.client.table("questions")
+                                        .select(columns)
+                                        .in_("quiz_id", quiz_ids)
+                                        .order("order_index,id"))
+            
+            for question in questions:
+                questions_by_quiz[question["quiz_id"]].append(question)
+            return questions_by_quiz
+            
+        except Exception as e:
+            print(f"Error getting questions by quiz: {e}")
+            return questions_by_quiz
+
     # ================================
     # RESPUESTAS
     # ================================
@@ -525,7 +692,7 @@ class SupabaseService:
                 "attempts": answer_data.get("attempts", 1),
                 "hint_used": answer_data.get("hint_used", False),
                 "confidence_level": answer_data.get("confidence_level"),
-                "answered_at": datetime.now().isoformat()
+                "answered_at": self._now_iso()
             }
             
             result = self.client.table("answers").insert(answer).execute()
@@ -579,11 +746,12 @@ class SupabaseService:
             # Verificar si existe progreso
             existing = await self.get_student_progress(student_id, class_id)
             
+            now = self._now_iso()
             progress_update = {
                 "student_id": student_id,
                 "class_id": class_id,
-                "last_activity": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
+                "last_activity": now,
+                "updated_at": now,
                 **progress_data
             }
             
@@ -597,7 +765,7 @@ class SupabaseService:
             else:
                 # Crear nuevo
                 progress_update["id"] = str(uuid.uuid4())
-                progress_update["created_at"] = datetime.now().isoformat()
+                progress_update["created_at"] = now
                 result = self.client.table("progress_metrics").insert(progress_update).execute()
             
             if result.data:
@@ -658,17 +826,23 @@ class SupabaseService:
         try:
             # Obtener estudiantes de la clase
             students = await self.get_class_students(class_id)
+            if not students:
+                return []
+            
+            # Sesiones de todos los estudiantes de la clase en una sola consulta
+            sessions = self.select_all(self.client.table("game_sessions")
+                                       .select("student_id, score, start_time, quizzes!inner(class_id)")
+                                       .in_("student_id", [student["id"] for student in students])
+                                       .eq("quizzes.class_id", class_id)
+                                       .order("start_time,id"))
+            
+            sessions_by_student = defaultdict(list)
+            for session in sessions:
+                sessions_by_student[session["student_id"]].append(session)
             
             results = []
             for student in students:
-                # Obtener sesiones del estudiante en esta clase
-                sessions_result = (self.client.table("game_sessions")
-                                 .select("*, quizzes!inner(class_id, title)")
-                                 .eq("student_id", student["id"])
-                                 .eq("quizzes.class_id", class_id)
-                                 .execute())
-                
-                sessions = sessions_result.data if sessions_result.data else []
+                sessions = sessions_by_student.get(student["id"], [])
                 
                 # Calcular estadísticas del estudiante
                 total_games = len(sessions)
@@ -697,48 +871,90 @@ class SupabaseService:
     async def join_class_by_code(self, student_id: str, class_code: str) -> Dict[str, Any]:
         """Unir estudiante a clase por código"""
         try:
-            # Buscar clase por código
-            class_result = (self.client.table("classes")
-                           .select("*")
-                           .eq("class_code", class_code)
-                           .eq("is_active", True)
-                           .single()
-                           .execute())
-            
-            if not class_result.data:
-                raise Exception("Class not found or inactive")
-            
-            class_data = class_result.data
-            
-            # Actualizar estudiante con class_id
-            update_result = (self.client.table("users")
-                           .update({"class_id": class_data["id"], "updated_at": datetime.now().isoformat()})
-                           .eq("id", student_id)
-                           .execute())
+            # Una sola llamada atómica (función SQL join_class_by_code en core/ludix_schema.sql)
+            try:
+                rpc_result = self.client.rpc(
+                    "join_class_by_code",
+                    {"p_student_id": student_id, "p_class_code": class_code}
+                ).execute()
+                class_data = rpc_result.data
+            except APIError as e:
+                if e.code not in RPC_FALLBACK_CODES:
+                    raise Exception(e.message)
+                # Base sin la función (o esquema anterior): mismo flujo en varias consultas
+                class_data = await self._join_class_by_code_queries(student_id, class_code)
+            
+            # El usuario cacheado en auth todavía tiene el class_id anterior
+            invalidate_cached_user(student_id)
+            
+            # Emitir evento de estudiante unido a clase
+            self._run_in_background(self.event_manager.emit_event(
+                EventType.STUDENT_JOINED_CLASS,
+                {
+                    "class_id": class_data["id"],
+                    "class_name": class_data["name"],
+                    "class_code": class_code
+                },
+                user_id=student_id
+            ))
             
-            if update_result.data:
-                # Emitir evento de estudiante unido a clase
-                import asyncio
-                asyncio.create_task(self.event_manager.emit_event(
-                    EventType.STUDENT_JOINED_CLASS,
-                    {
-                        "class_id": class_data["id"],
-                        "class_name": class_data["name"],
-                        "class_code": class_code
-                    },
-                    user_id=student_id
-                ))
-                
-                return {
-                    "message": "Successfully joined class",
-                    "class": class_data,
-                    "student_updated": True
-                }
-            else:
-                raise Exception("Failed to update student")
+            return {
+                "message": "Successfully joined class",
+                "class": class_data,
+                "student_updated": True
+            }
                 
         except Exception as e:
             raise Exception(f"Error joining class: {str(e)}")
+    
+    async def _join_class_by_code_queries(self, student_id: str, class_code: str) -> Dict[str, Any]:
+        """Unir estudiante a clase sin la función SQL (buscar clase, validar cupo, actualizar)"""
+        # Buscar clase por código
+        class_result = (self.client.table("classes")
+                       .select("*")
+                       .eq("class_code", class_code)
+                       .eq("is_active", True)
+                       .single()
+                       .execute())
+        
+        if not class_result.data:
+            raise Exception("Class not found or inactive")
+        
+        class_data = class_result.data
+        
+        # Validar cupo
+        max_students = class_data.get("max_students")
+        if max_students is not None:
+            count_result = (self.client.table("users")
+                           .select("id", count="exact")
+                           .eq("class_id", class_data["id"])
+                           .neq("id", student_id)
+                           .limit(1)
+                           .execute())
+            if (count_result.count or 0) >= max_students:
+                raise Exception("Class is full")
+        
+        # Actualizar estudiante con class_id
+        update_result = (self.client.table("users")
+                       .update({"class_id": class_data["id"], "updated_at": self._now_iso()})
+                       .eq("id", student_id)
+                       .execute())
+        
+        if not update_result.data:
+            raise Exception("Failed to update student")
+        
+        return class_data
+    
+    async def bulk_insert(self, table: str, rows: List[Dict[str, Any]],
+                          chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> int:
+        """Insertar muchas filas en lotes de chunk_size (un request por lote, sin devolver filas)"""
+        try:
+            for start in range(0, len(rows), chunk_size):
+                self.client.table(table).insert(rows[start:start + chunk_size], returning="minimal").execute()
+            return len(rows)
+            
+        except Exception as e:
+            raise Exception(f"Error bulk inserting into {table}: {str(e)}")
 
 # Instancia global del servicio
 supabase_service = SupabaseService()
@@ -39,7 +39,7 @@ echo "   - SUPABASE_KEY=tu-anon-key"
 echo "   - SUPABASE_SERVICE_KEY=tu-service-key"
 echo ""
 echo "4. 🗄️  Ejecuta el SQL schema en el SQL Editor de Supabase:"
-echo "   (Copia el contenido de core/supabase_client.py - LUDIX_SCHEMA)"
+echo "   (Copia el contenido de core/ludix_schema.sql)"
 echo ""
 echo "5. 🚀 Ejecuta el servidor:"
 echo "   python main.py"
@@ -0,0 +1,29 @@
+# tests/test_question_factory.py
+import pytest
+
+from patterns.question_factory import QuestionFactory
+
+def test_campo_faltante_reporta_el_primero_en_orden_declarado():
+    # Faltan 'options' y 'correct_answer': se informa 'options' como antes
+    with pytest.raises(ValueError, match="Campo requerido 'options' faltante para pregunta de opción múltiple"):
+        QuestionFactory.create_question("multiple_choice", question_text="¿2 + 2?")
+
+    with pytest.raises(ValueError, match="Campo requerido 'question_text' faltante"):
+        QuestionFactory.create_question("matching")
+
+@pytest.mark.parametrize("correcta", [True, False])
+@pytest.mark.parametrize("respuesta, valor", [
+    ("true", True), ("false", False),
+    ("Verdadero", True), (" falso ", False),
+    (1, True), (0, False),
+    (True, True), (False, False),
+])
+def test_verdadero_falso_valida_strings_enteros_y_bools(correcta, respuesta, valor):
+    pregunta = QuestionFactory.create_question("true_false", question_text="¿El agua moja?", correct_answer=correcta)
+    assert pregunta.validate_answer(respuesta) is (valor == correcta)
+
+@pytest.mark.parametrize("respuesta", ["quizás", "", None, 1.0, []])
+def test_verdadero_falso_rechaza_respuestas_no_reconocidas(respuesta):
+    for correcta in (True, False):
+        pregunta = QuestionFactory.create_question("true_false", question_text="¿El agua moja?", correct_answer=correcta)
+        assert pregunta.validate_answer(respuesta) is False
@@ -0,0 +1,36 @@
+# tests/test_security.py
+import hashlib
+
+import pytest
+
+from core.security import (
+    hash_password,
+    hash_password_async,
+    needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+
+def test_hash_bcrypt_verifica_la_misma_contrasena():
+    hashed = hash_password("clave-secreta")
+    assert hashed.startswith("$2")
+    assert hashed != "clave-secreta"
+    assert verify_password("clave-secreta", hashed)
+    assert not needs_rehash(hashed)
+
+def test_contrasena_incorrecta_no_verifica():
+    hashed = hash_password("clave-secreta")
+    assert not verify_password("otra-clave", hashed)
+    assert not verify_password("clave-secreta", "")
+
+def test_hash_sha256_heredado_verifica_y_pide_rehash():
+    legacy = hashlib.sha256("clave-vieja".encode()).hexdigest()
+    assert verify_password("clave-vieja", legacy)
+    assert not verify_password("otra-clave", legacy)
+    assert needs_rehash(legacy)
+
+@pytest.mark.asyncio
+async def test_hash_y_verificacion_async():
+    hashed = await hash_password_async("clave-async")
+    assert await verify_password_async("clave-async", hashed)
+    assert not await verify_password_async("otra", hashed)
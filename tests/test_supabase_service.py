@@ -0,0 +1,79 @@
+# tests/test_supabase_service.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from postgrest.exceptions import APIError
+
+from core.auth_cache import cache_get, cache_set, user_cache
+from services.supabase_service import CLASS_CODE_MAX_ATTEMPTS, SupabaseService
+
+class _Query:
+    """Cadena mínima de postgrest: cualquier filtro devuelve la misma consulta"""
+
+    def __init__(self, results):
+        self._results = results
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        result = self._results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return SimpleNamespace(data=result, count=None)
+
+def _service(table_results=None, rpc_results=None):
+    service = SupabaseService.__new__(SupabaseService)
+    service._background_tasks = set()
+    service.event_manager = SimpleNamespace(emit_event=lambda *args, **kwargs: asyncio.sleep(0))
+    service.client = SimpleNamespace(
+        table=lambda name: _Query(table_results),
+        rpc=lambda name, params: _Query(rpc_results),
+    )
+    return service
+
+@pytest.mark.asyncio
+async def test_unirse_a_clase_invalida_el_usuario_cacheado():
+    cache_set(user_cache, "alumno-1", {"id": "alumno-1", "class_id": None}, 60)
+    service = _service(rpc_results=[{"id": "clase-1", "name": "Aula"}])
+
+    await service.join_class_by_code("alumno-1", "ABC123")
+
+    assert cache_get(user_cache, "alumno-1") is None
+
+@pytest.mark.asyncio
+async def test_actualizar_usuario_invalida_el_usuario_cacheado():
+    cache_set(user_cache, "alumno-2", {"id": "alumno-2", "name": "Viejo"}, 60)
+    service = _service(table_results=[[{"id": "alumno-2", "name": "Nuevo"}]])
+
+    await service.update_user("alumno-2", {"name": "Nuevo"})
+
+    assert cache_get(user_cache, "alumno-2") is None
+
+def _unique_violation():
+    return APIError({"code": "23505", "message": "duplicate key value violates unique constraint"})
+
+@pytest.mark.asyncio
+async def test_crear_clase_reintenta_con_otro_codigo_si_choca_unique():
+    service = _service(table_results=[_unique_violation(), [{"id": "clase-1", "class_code": "BBBBBB"}]])
+    codes = iter(["AAAAAA", "BBBBBB"])
+
+    async def next_code(n):
+        return [next(codes)]
+    service._generate_unique_class_codes = next_code
+
+    created = await service.create_class("Aula", "", "profe-1")
+
+    assert created["class_code"] == "BBBBBB"
+
+@pytest.mark.asyncio
+async def test_crear_clase_se_rinde_tras_el_maximo_de_intentos():
+    service = _service(table_results=[_unique_violation() for _ in range(CLASS_CODE_MAX_ATTEMPTS)])
+
+    async def same_code(n):
+        return ["AAAAAA"]
+    service._generate_unique_class_codes = same_code
+
+    with pytest.raises(Exception, match="duplicate key"):
+        await service.create_class("Aula", "", "profe-1")